@@ -1,6 +1,6 @@
 from numpy import *
-from scipy.integrate import solve_ivp
 import matplotlib.pyplot as plt
+from geodesics import Ellipsoid, tangent_unit, geodesic_path, solve_geodesic_ivp, closure_event
 
 f=1/sqrt(2) #f = (a-c)/a
 
@@ -8,53 +8,12 @@ a=1
 b=a
 c=a-a*f
 
-def F(x, y, z):
-    return x**2 / a**2 + y**2 / b**2 + z**2 / c**2 - 1
-
-def findz(x,y):
-    return sqrt(1-x ** 2 / a ** 2 - y ** 2 / b ** 2) * c
-
-def gradF(x, y, z):
-    Fx = 2 * x / a**2
-    Fy = 2 * y / b**2
-    Fz = 2 * z / c**2
-    return stack((Fx, Fy, Fz))
-
-def HF(x, y, z):
-    Fxx = 2 / a**2
-    Fxy = 0
-    Fxz = 0
-    Fyy = 2 / b**2
-    Fyz = 0
-    Fzz = 2 / c**2
-    return array([[Fxx, Fxy, Fxz], [Fxy, Fyy, Fyz], [Fxz, Fyz, Fzz]])
-
-def my_geodesic(gradF, HF, ip, iv, distance):
-    gradient = gradF(ip[0], ip[1], ip[2])
-    iv = iv - dot(gradient, iv) * gradient / dot(gradient, gradient)
-    iv = iv / sqrt(sum(iv**2))
-
-    def geode(t, y):
-        X = y[:3]
-        Xdot = y[3:]
-        nablaF = gradF(X[0], X[1], X[2])
-        hessian = HF(X[0], X[1], X[2])
-        num = (Xdot[None, :] * hessian * Xdot[:, None]).sum()
-        den = dot(nablaF, nablaF)
-        Xdotdot = - num / den * nablaF
-        return hstack((Xdot, Xdotdot))
-
-    ic = hstack((ip, iv))
-    u = solve_ivp(geode, [0, distance], ic, dense_output=True, rtol=1e-10, atol=1e-10)
-    assert u.success
-    yy = u.sol(linspace(0, distance, 1000))
-    return yy
+surface = Ellipsoid(a, b, c)
+findz = surface.height
 
 ip = array([1,0,findz(1,0)])
 iv = array([0,1,1])
-gradient = gradF(ip[0], ip[1], ip[2])
-iv = iv - dot(gradient, iv) * gradient / dot(gradient, gradient)
-iv = iv / sqrt(sum(iv**2))
+iv = tangent_unit(surface, ip, iv)
 distance = 80 * pi
 print('ip:',ip)
 print('real iv:',iv)
@@ -80,8 +39,13 @@ print('parameter latitude is:',beta)
 print("flattening is:",f)
 
 
+#80 pi of path: sample adaptively (to within 1e-3) rather than at 1000 points
+yy = geodesic_path(surface, ip, iv, distance, tol=1e-3)
 
-yy = my_geodesic(gradF, HF, ip, iv, distance)
+#closure: stop as soon as the path comes back within 0.1 of ip
+u = solve_geodesic_ivp(surface, ip, iv, distance, events=closure_event(ip, radius=0.1))
+if u.status == 1:
+    print('returns near ip after length:', u.t[-1])
 
 ax = plt.figure().add_subplot(projection='3d')
 theta = linspace(0, 2 * pi, 100)
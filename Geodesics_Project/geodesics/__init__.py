@@ -0,0 +1,17 @@
+# Shared geodesic machinery for the scripts in Geodesics_Project.
+from .ode import geodesic_acceleration, geodesic_rhs, geodesic_jacobian
+from .surfaces import Surface, GraphSurface, Ellipsoid, Sphere, GaussianBump, ManyMountain
+from .ivp import tangent_unit, solve_geodesic_ivp, geodesic_path, geodesic_fan
+from .bvp import (endpoint_bc, endpoint_bc_jac, semicircle_guess, line_guess, project_points,
+                  chord_guess, mesh_guess, smart_guess, solve_geodesic_bvp)
+from .cache import DiskCache, make_key, surface_key, dense_to_ppoly, GeodesicCache
+from .sweep import sweep_pairs, sweep_grid
+from .shooting import tangent_basis, shoot, solve_geodesic_shooting
+from .events import plane_event, height_event, closure_event, box_event
+from .projected import project_state, constraint_residuals, solve_geodesic_projected
+from .symbolic import SymbolicSurface
+from .mesh import grid_mesh, surface_mesh, MeshGeodesics, heat_geodesics
+from .sampling import breakpoints, refine, iter_adaptive_samples, adaptive_samples
+from .length import interval_lengths, arc_length
+from .trace import Trace
+from .pairwise import distance_matrix
@@ -0,0 +1,234 @@
+# Headless batch runner for geodesic jobs.
+#
+#     python -m geodesics.batch jobs.json -o results.npz --processes 8
+#
+# The job file is JSON: {"defaults": {...}, "jobs": [{...}, ...]} (or just
+# the list of jobs), or JSON lines with one job per line. Each job is a dict
+#
+#     {"name": "cap", "kind": "bvp", "surface": {"type": "GaussianBump", "params": {"a": 3}},
+#      "pa": [5, 5], "pb": [-5, -5], "tol": 1e-5}
+#     {"kind": "ivp", "surface": {"type": "Sphere", "params": {"R": 3}},
+#      "ip": [0, 2, 2.2360679775], "iv": [1, 2, 3], "distance": 21.99}
+#     {"kind": "shooting", "surface": ..., "ip": [0, 0, 3], "fp": [0, 3, 0]}
+#
+# with defaults filled in from "defaults". Surfaces use the same
+# {"type", "params"} form as geodesics.cache.surface_key (SymbolicSurface
+# takes "expr" among its params, and "graph": true when expr is f(x, y) - z,
+# which [x, y] points need). Points are [x, y, z], or [x, y] for the
+# surface point above (x, y). Other keys are passed to the solver (tol,
+# max_nodes, epsilon, rtol, atol, max_iter); "samples" is the chordal
+# tolerance the path is sampled to (0: no path) and "guess" picks the BVP
+# guess ("smart", "semicircle" or "line").
+#
+# Jobs run in a process pool; a job that raises is reported with
+# success=False and the error as its message, and the rest carry on. Nothing
+# here imports matplotlib. Results go to a compressed .npz (see load_batch)
+# or, with pyarrow installed, a .parquet table with one row per job.
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from . import surfaces
+from .bvp import line_guess, semicircle_guess, smart_guess, solve_geodesic_bvp
+from .ivp import solve_geodesic_ivp, tangent_unit
+from .jit import jit_available, jit_geodesic_sol
+from .length import arc_length
+from .sampling import adaptive_samples, breakpoints
+from .shooting import solve_geodesic_shooting
+from .symbolic import SymbolicSurface
+
+FIELDS = ("success", "length", "length_error", "niter", "nfev", "nodes", "seconds")
+SURFACES = {cls.__name__: cls for cls in (surfaces.Ellipsoid, surfaces.Sphere,
+                                          surfaces.GaussianBump, surfaces.ManyMountain,
+                                          SymbolicSurface)}
+SOLVER_OPTIONS = {
+    "bvp": ("tol", "max_nodes", "epsilon"),
+    "ivp": ("rtol", "atol", "epsilon", "project"),
+    "shooting": ("tol", "max_iter", "rtol", "atol", "epsilon"),
+}
+
+_surfaces = {}
+
+
+def build_surface(spec):
+    """The surface described by {"type": ..., "params": {...}}; reused per process."""
+    key = json.dumps(spec, sort_keys=True)
+    if key not in _surfaces:
+        if spec["type"] not in SURFACES:
+            raise ValueError(f"unknown surface type {spec['type']!r}")
+        params = dict(spec.get("params", {}))
+        if spec["type"] == "SymbolicSurface":
+            expr, graph = params.pop("expr"), params.pop("graph", False)
+            _surfaces[key] = SymbolicSurface(expr, params, graph=graph)
+        else:
+            _surfaces[key] = SURFACES[spec["type"]](**params)
+    return _surfaces[key]
+
+
+def _point(surface, p):
+    p = np.asarray(p, dtype=float)
+    return surface.point(*p) if p.size == 2 else p
+
+
+def _solve(job):
+    kind = job["kind"]
+    if kind not in SOLVER_OPTIONS:
+        raise ValueError(f"unknown job kind {kind!r}")
+    surface = build_surface(job["surface"])
+    options = {k: job[k] for k in SOLVER_OPTIONS[kind] if k in job}
+    if kind == "bvp":
+        pa, pb = _point(surface, job["pa"]), _point(surface, job["pb"])
+        guess = {"smart": smart_guess, "semicircle": lambda s, a, b: semicircle_guess(),
+                 "line": lambda s, a, b: line_guess(a, b)}[job.get("guess", "smart")]
+        u = solve_geodesic_bvp(surface, pa, pb, guess(surface, pa, pb), **options)
+        return u.sol, {"success": u.success, "niter": u.niter, "nodes": u.x.size,
+                       "message": u.message}
+    if kind == "ivp":
+        ip = _point(surface, job["ip"])
+        if jit_available(surface) and set(options) <= {"rtol", "atol", "project"}:
+            iv = tangent_unit(surface, ip, job["iv"]) if options.pop("project", True) \
+                else np.asarray(job["iv"], dtype=float)
+            sol = jit_geodesic_sol(surface, np.hstack((ip, iv)), job["distance"], **options)
+            return sol, {"success": True, "nodes": sol.x.size, "message": "compiled DOPRI5"}
+        u = solve_geodesic_ivp(surface, ip, job["iv"], job["distance"], **options)
+        return u.sol, {"success": u.success, "nfev": u.nfev,
+                       "nodes": breakpoints(u.sol).size, "message": u.message}
+    if kind == "shooting":
+        r = solve_geodesic_shooting(surface, _point(surface, job["ip"]),
+                                    _point(surface, job["fp"]), **options)
+        # The length is exactly |w|; no need to integrate the speed.
+        return r.sol, {"success": r.success, "niter": r.nit, "nfev": r.nfev,
+                       "length": r.length, "message": r.message}
+
+
+def run_job(job):
+    """Solve one job; returns its summary fields, message and sampled path."""
+    out = {name: np.nan for name in FIELDS}
+    out.update(success=False, message="", t=np.empty(0), path=np.empty((3, 0)))
+    start = time.perf_counter()
+    try:
+        sol, stats = _solve(job)
+        out.update(stats)
+        if out["success"] and np.isnan(out["length"]):
+            out["length"], out["length_error"] = arc_length(sol)
+        if out["success"] and job.get("samples", 1e-3):
+            out["t"], y = adaptive_samples(sol, job.get("samples", 1e-3))
+            out["path"] = y[:3]
+    except Exception as error:
+        out["message"] = f"{type(error).__name__}: {error}"
+    out["seconds"] = time.perf_counter() - start
+    return out
+
+
+def read_jobs(path):
+    """The jobs in a .json / .jsonl job file, with defaults filled in."""
+    with open(path) as f:
+        if path.endswith(".jsonl"):
+            data = [json.loads(line) for line in f if line.strip()]
+        else:
+            data = json.load(f)
+    if isinstance(data, dict):
+        defaults, jobs = data.get("defaults", {}), data["jobs"]
+    else:
+        defaults, jobs = {}, data
+    jobs = [{**defaults, **job} for job in jobs]
+    for i, job in enumerate(jobs):
+        job.setdefault("name", f"job{i}")
+    return jobs
+
+
+def run_jobs(jobs, processes=None):
+    """run_job over jobs, in a pool unless processes == 1; results in job order."""
+    if processes == 1:
+        return [run_job(job) for job in jobs]
+    with ProcessPoolExecutor(processes) as pool:
+        return list(pool.map(run_job, jobs))
+
+
+def save_npz(path, jobs, results):
+    """Summary arrays (one entry per job) plus all paths concatenated.
+
+    Job i's path is paths[:, offsets[i]:offsets[i + 1]] at parameters
+    t[offsets[i]:offsets[i + 1]]. The job list itself is kept as JSON.
+    """
+    sizes = [r["t"].size for r in results]
+    np.savez_compressed(
+        path,
+        names=np.array([job["name"] for job in jobs]),
+        kinds=np.array([job["kind"] for job in jobs]),
+        messages=np.array([str(r["message"]) for r in results]),
+        offsets=np.concatenate(([0], np.cumsum(sizes))).astype(np.int64),
+        t=np.concatenate([r["t"] for r in results]),
+        paths=np.concatenate([r["path"] for r in results], axis=1),
+        jobs=np.array(json.dumps(jobs)),
+        **{name: np.array([r[name] for r in results], dtype=float) for name in FIELDS},
+    )
+
+
+def load_batch(path):
+    """Read save_npz output: a dict of summary arrays, plus "paths" as a list."""
+    with np.load(path) as data:
+        out = {name: data[name] for name in data.files}
+    offsets = out.pop("offsets")
+    paths = out.pop("paths")
+    out["paths"] = [paths[:, a:b] for a, b in zip(offsets[:-1], offsets[1:])]
+    out["t"] = [out["t"][a:b] for a, b in zip(offsets[:-1], offsets[1:])]
+    out["jobs"] = json.loads(out["jobs"].item())
+    return out
+
+
+def save_parquet(path, jobs, results):
+    """One row per job; the path as list columns x, y, z and t. Needs pyarrow."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    columns = {
+        "name": [job["name"] for job in jobs],
+        "kind": [job["kind"] for job in jobs],
+        "message": [str(r["message"]) for r in results],
+        **{name: [float(r[name]) for r in results] for name in FIELDS},
+        "t": [r["t"].tolist() for r in results],
+        **{axis: [r["path"][k].tolist() for r in results] for k, axis in enumerate("xyz")},
+    }
+    pq.write_table(pa.table(columns), path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m geodesics.batch",
+                                     description="Solve a file of geodesic jobs headlessly.")
+    parser.add_argument("jobs", help="job file (.json or .jsonl)")
+    parser.add_argument("-o", "--output", required=True, help="results file (.npz or .parquet)")
+    parser.add_argument("--processes", type=int, default=None,
+                        help="worker processes (default: one per CPU; 1: no pool)")
+    args = parser.parse_args(argv)
+
+    parquet = args.output.endswith(".parquet")
+    if parquet:
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            parser.error("writing .parquet needs pyarrow; use an .npz output instead")
+
+    jobs = read_jobs(args.jobs)
+    start = time.perf_counter()
+    results = run_jobs(jobs, args.processes)
+    directory = os.path.dirname(args.output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    (save_parquet if parquet else save_npz)(args.output, jobs, results)
+
+    failed = [job["name"] for job, r in zip(jobs, results) if not r["success"]]
+    print(f"{len(jobs)} jobs in {time.perf_counter() - start:.2f} s, "
+          f"{len(failed)} failed; wrote {args.output}")
+    for job, r in zip(jobs, results):
+        if not r["success"]:
+            print(f"  {job['name']}: {r['message']}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
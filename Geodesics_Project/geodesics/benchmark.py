@@ -0,0 +1,265 @@
+# Benchmarks for the geodesic solvers, one case per script scenario.
+#
+#     python -m geodesics.benchmark                     # run all, compare to the last run
+#     python -m geodesics.benchmark sphere_ivp peak_map --repeat 5
+#     python -m geodesics.benchmark --label before      # name this run ...
+#     python -m geodesics.benchmark --compare before    # ... and compare against it later
+#
+# Every case reports its best wall time over --repeat runs (after one
+# untimed warm-up, which also triggers any numba compilation) plus solver
+# counters: RHS evaluations, Newton / shooting iterations, mesh nodes, and,
+# on the sphere, the error against the exact great circle. Runs are appended
+# to a JSON-lines history so later runs can be compared with earlier ones.
+import argparse
+import datetime
+import json
+import os
+import subprocess
+import time
+
+import numpy as np
+
+from .bvp import semicircle_guess, solve_geodesic_bvp
+from .ivp import geodesic_path, solve_geodesic_ivp, tangent_unit
+from .jit import jit_available
+from .length import arc_length
+from .shooting import solve_geodesic_shooting
+from .surfaces import Ellipsoid, GaussianBump, ManyMountain, Sphere
+from .sweep import sweep_grid
+
+DEFAULT_HISTORY = ".geodesics_cache/benchmarks.jsonl"
+
+
+class CountingSurface:
+    """Wraps a surface and counts gradF calls and the points they cover.
+
+    Every RHS evaluation calls gradF once, and so does every Jacobian
+    evaluation (solve_bvp, shooting), so for the IVPs these are the RHS
+    counts. Everything else is passed through to the wrapped surface.
+    """
+
+    def __init__(self, surface):
+        self.surface = surface
+        self.calls = self.points = 0
+
+    def gradF(self, x, y, z):
+        self.calls += 1
+        self.points += np.size(x)
+        return self.surface.gradF(x, y, z)
+
+    def __getattr__(self, name):
+        return getattr(self.surface, name)
+
+
+def great_circle(R, ip, iv, t):
+    """Exact unit-speed geodesic on the sphere of radius R from ip along iv."""
+    iv = iv / np.linalg.norm(iv)
+    return np.outer(ip, np.cos(t / R)) + R * np.outer(iv, np.sin(t / R))
+
+
+def sphere_ivp():
+    # ivp_ball.py through SciPy, checked against the exact great circle.
+    surface = CountingSurface(Sphere(3))
+    ip = np.array([0, 2, np.sqrt(5)])
+    iv = tangent_unit(surface, ip, [1, 2, 3])
+    u = solve_geodesic_ivp(surface, ip, iv, 7 * np.pi)
+    t = np.linspace(0, 7 * np.pi, 1000)
+    error = np.abs(u.sol(t)[:3] - great_circle(3, ip, iv, t)).max()
+    return {"nfev": u.nfev, "grad_points": surface.points, "error": error}
+
+
+def sphere_path():
+    # ivp_ball.py as the script runs it (compiled stepper when available).
+    ip = np.array([0, 2, np.sqrt(5)])
+    iv = tangent_unit(Sphere(3), ip, [1, 2, 3])
+    path = geodesic_path(Sphere(3), ip, iv, 7 * np.pi)
+    error = np.abs(path[:3] - great_circle(3, ip, iv, np.linspace(0, 7 * np.pi, 1000))).max()
+    return {"jit": jit_available(Sphere(3)), "error": error}
+
+
+def sphere_bvp():
+    # velocity_cal_length.py: half a great circle, length 3 pi.
+    surface = CountingSurface(Sphere(3))
+    u = solve_geodesic_bvp(surface, np.array([0, 3.0, 0]), np.array([0, -3.0, 0]),
+                           semicircle_guess(3, 100), tol=1e-5, max_nodes=5000)
+    return {"success": u.success, "niter": u.niter, "nodes": u.x.size,
+            "grad_calls": surface.calls, "grad_points": surface.points,
+            "error": abs(arc_length(u.sol)[0] - 3 * np.pi)}
+
+
+def sphere_shooting():
+    # optimize_geodesic_path.py: a quarter great circle, length 3 pi / 2.
+    surface = CountingSurface(Sphere(3))
+    result = solve_geodesic_shooting(surface, np.array([0, 0, 3.0]), np.array([0, 3.0, 0]))
+    return {"success": result.success, "niter": result.nit, "shots": result.nfev,
+            "grad_calls": surface.calls, "grad_points": surface.points,
+            "error": abs(result.length - 1.5 * np.pi)}
+
+
+def gaussian_ivp():
+    # ivp_lonely.py
+    surface = CountingSurface(GaussianBump(3))
+    ip = np.array([-5.0, 0.0, surface.height(-3, 0)])
+    u = solve_geodesic_ivp(surface, ip, [1.0, 1.0, 0.0], 20)
+    return {"nfev": u.nfev, "grad_points": surface.points}
+
+
+def gaussian_bvp():
+    # bvp_guassian_surf.py with the default guess.
+    surface = CountingSurface(GaussianBump(3))
+    u = solve_geodesic_bvp(surface, surface.point(5.0, 5.0), surface.point(-5.0, -5.0),
+                           tol=1e-5, max_nodes=5000)
+    return {"success": u.success, "niter": u.niter, "nodes": u.x.size,
+            "grad_calls": surface.calls, "grad_points": surface.points}
+
+
+def many_mountain_ivp():
+    # ivp_many_mountain.py through SciPy.
+    surface = CountingSurface(ManyMountain())
+    ip = np.array([0, 0, surface.height(0, 0)])
+    u = solve_geodesic_ivp(surface, ip, [1, 1, 0], 15 * np.pi)
+    return {"nfev": u.nfev, "grad_points": surface.points}
+
+
+def ellipsoid_80pi():
+    # ellipse_revolution.py: 80 pi around a flattened ellipsoid of revolution.
+    surface = Ellipsoid(1, 1, 1 - 1 / np.sqrt(2))
+    ip = np.array([1, 0, surface.height(1, 0)])
+    path = geodesic_path(surface, ip, [0, 1, 1], 80 * np.pi)
+    # Clairaut: r cos(angle to the parallel) is constant along the path.
+    clairaut = (path[0] * path[4] - path[1] * path[3]) / np.linalg.norm(path[3:], axis=0)
+    return {"jit": jit_available(surface), "clairaut_drift": np.ptp(clairaut)}
+
+
+def peak_map():
+    # peak_map.py on a 10 x 10 grid, solved in this process.
+    surface = GaussianBump(a=2)
+    X, Y = np.meshgrid(np.linspace(-5, 5, 10), np.linspace(-5, 5, 10))
+    result = sweep_grid(surface, X, Y, surface.point(-5.0, -5.0), tol=1e-5, max_nodes=5000,
+                        guess="smart", processes=1)
+    return {"failures": int(np.sum(result["success"] == 0)), "niter": int(result["niter"].sum()),
+            "nodes": float(result["nodes"].mean())}
+
+
+CASES = {case.__name__: case for case in (
+    sphere_ivp, sphere_path, sphere_bvp, sphere_shooting, gaussian_ivp, gaussian_bvp,
+    many_mountain_ivp, ellipsoid_80pi, peak_map,
+)}
+
+
+def run_case(name, repeat=5):
+    """Metrics of one case: its counters plus the best of repeat wall times."""
+    CASES[name]()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        metrics = CASES[name]()
+        times.append(time.perf_counter() - start)
+    return {"time": min(times), **{key: _plain(value) for key, value in metrics.items()}}
+
+
+def _plain(value):
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_history(path=DEFAULT_HISTORY):
+    """All recorded runs, oldest first."""
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def save_run(run, path=DEFAULT_HISTORY):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "a") as f:
+        f.write(json.dumps(run) + "\n")
+
+
+def find_run(history, label=None):
+    """The latest run with this label (None: the latest run of all)."""
+    for run in reversed(history):
+        if label is None or run.get("label") == label:
+            return run
+    return None
+
+
+def compare(results, baseline, threshold=1.2):
+    """Table comparing results with a baseline run's; slow cases are flagged.
+
+    A case is flagged when its time exceeds threshold times the baseline.
+    """
+    rows = [f"{'case':<18} {'metric':<14} {'now':>12} {'before':>12} {'ratio':>8}"]
+    old = baseline["results"] if baseline else {}
+    for case, metrics in results.items():
+        for key, value in metrics.items():
+            before = old.get(case, {}).get(key)
+            ratio = ""
+            if isinstance(value, (int, float)) and isinstance(before, (int, float)) \
+                    and not isinstance(value, bool) and before:
+                ratio = f"{value / before:8.2f}"
+                if key == "time" and value > threshold * before:
+                    ratio += "  SLOWER"
+            rows.append(f"{case:<18} {key:<14} {_fmt(value):>12} {_fmt(before):>12} {ratio}")
+    return "\n".join(rows)
+
+
+def _fmt(value):
+    if value is None:
+        return "-"
+    if isinstance(value, float):
+        return f"{value:.4g}"
+    return str(value)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m geodesics.benchmark",
+                                     description="Time the geodesic solvers.")
+    parser.add_argument("cases", nargs="*", metavar="case",
+                        help=f"cases to run (default: all of {', '.join(CASES)})")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per case")
+    parser.add_argument("--label", help="name to store this run under")
+    parser.add_argument("--compare", metavar="LABEL",
+                        help="baseline run to compare with (default: the previous run)")
+    parser.add_argument("--history", default=DEFAULT_HISTORY, help="JSON-lines history file")
+    parser.add_argument("--threshold", type=float, default=1.2,
+                        help="flag cases slower than this factor times the baseline")
+    parser.add_argument("--no-save", action="store_true", help="do not record this run")
+    args = parser.parse_args(argv)
+    unknown = set(args.cases) - set(CASES)
+    if unknown:
+        parser.error(f"unknown case(s): {', '.join(sorted(unknown))}")
+
+    history = load_history(args.history)
+    baseline = find_run(history, args.compare)
+    if args.compare and baseline is None:
+        parser.error(f"no run labelled {args.compare!r} in {args.history}")
+
+    results = {}
+    for name in args.cases or CASES:
+        results[name] = run_case(name, args.repeat)
+        print(f"{name}: {results[name]['time']:.4g} s", flush=True)
+
+    run = {"label": args.label, "commit": _commit(),
+           "date": datetime.datetime.now().isoformat(timespec="seconds"), "results": results}
+    if not args.no_save:
+        save_run(run, args.history)
+    print()
+    if baseline:
+        print(f"compared with {baseline.get('label') or 'previous run'} "
+              f"({baseline.get('commit')}, {baseline.get('date')})")
+    print(compare(results, baseline, args.threshold))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+# Boundary value problems: "get from A to B".
+import warnings
+
+import numpy as np
+from scipy.integrate import solve_bvp
+
+from .ode import geodesic_rhs, geodesic_jacobian
+
+
+def endpoint_bc(pa, pb):
+    """Boundary conditions fixing the start at pa and the end at pb."""
+    pa = np.asarray(pa, dtype=float)
+    pb = np.asarray(pb, dtype=float)
+
+    def bc(ya, yb):
+        return np.concatenate((ya[:3] - pa, yb[:3] - pb))
+
+    return bc
+
+
+def endpoint_bc_jac(ya, yb):
+    """Jacobian of endpoint_bc: constant, since the conditions are linear."""
+    dbc_dya = np.zeros((6, 6))
+    dbc_dyb = np.zeros((6, 6))
+    dbc_dya[:3, :3] = np.eye(3)
+    dbc_dyb[3:, :3] = np.eye(3)
+    return dbc_dya, dbc_dyb
+
+
+def semicircle_guess(R=3.0, n=100):
+    """The scripts' usual guess: a radius-R semicircle in the plane z = 0."""
+    t = np.linspace(0, 1, n)
+    theta = np.linspace(0, np.pi, n)
+    y = np.zeros((6, n))
+    y[:3] = np.vstack((R * np.cos(theta), R * np.sin(theta), np.zeros_like(theta)))
+    return t, y
+
+
+def line_guess(pa, pb, n=100):
+    """Straight chord from pa to pb (not on the surface)."""
+    t = np.linspace(0, 1, n)
+    y = np.zeros((6, n))
+    y[:3] = np.linspace(pa, pb, n).T
+    return t, y
+
+
+def project_points(surface, P, iterations=20, tol=1e-12):
+    """Newton-project the columns of P (shape (3, n)) onto F = 0 along gradF."""
+    P = np.array(P, dtype=float)
+    for _ in range(iterations):
+        F = surface.F(*P)
+        g = surface.gradF(*P)
+        P -= F * g / np.sum(g * g, axis=0)
+        if np.all(np.abs(F) < tol):
+            break
+    return P
+
+
+def _path_guess(P, n):
+    # Resample a polyline P (3, m) to n points evenly spaced in arc length,
+    # with velocities for t in [0, 1].
+    s = np.concatenate(([0], np.cumsum(np.linalg.norm(np.diff(P, axis=1), axis=0))))
+    t = np.linspace(0, 1, n)
+    y = np.zeros((6, n))
+    y[:3] = [np.interp(t * s[-1], s, row) for row in P]
+    y[3:] = np.gradient(y[:3], t, axis=1)
+    return t, y
+
+
+def _broken(surface, P):
+    # The projection failed to converge, or tore the curve apart.
+    steps = np.linalg.norm(np.diff(P, axis=1), axis=0)
+    return (not np.all(np.isfinite(P)) or np.max(np.abs(surface.F(*P))) > 1e-6
+            or steps.max() > 10 * steps.sum() / steps.size)
+
+
+def chord_guess(surface, pa, pb, n=100):
+    """The chord from pa to pb projected onto the surface.
+
+    Each point is Newton-projected along gradF. That can break down: fail
+    to converge, or tear the curve apart (a chord through the centre of a
+    sphere snaps onto the two poles with a jump in between, and one over a
+    steep peak slides off it on both sides). A graph surface then lifts the
+    chord straight up or down onto it instead, which cannot tear; any other
+    surface raises ValueError.
+    """
+    t, y = line_guess(pa, pb, n)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        P = project_points(surface, y[:3])
+        if _broken(surface, P) and surface.graph:
+            P = y[:3]
+            P[2] = surface.height(P[0], P[1])
+        if _broken(surface, P):
+            raise ValueError("chord cannot be projected onto the surface")
+    return _path_guess(P, n)
+
+
+def mesh_guess(mesh, pa, pb, n=100):
+    """Shortest mesh-edge path between the vertices nearest pa and pb.
+
+    mesh is a geodesics.mesh.MeshGeodesics (e.g. from heat_geodesics).
+    """
+    P = mesh.graph_path(mesh.nearest_vertex(pa), mesh.nearest_vertex(pb))
+    P = np.vstack((pa, P[1:-1], pb)) if len(P) > 2 else np.vstack((pa, pb))
+    return _path_guess(P.T, n)
+
+
+def smart_guess(surface, pa, pb, n=100, mesh=None):
+    """A guess that actually joins pa and pb.
+
+    Uses the mesh path when a mesh is given, otherwise the projected chord,
+    and falls back to the semicircle (with a RuntimeWarning) when the chord
+    cannot be projected. The chord stays over the straight line from pa to
+    pb, so where that line crosses a peak the solve finds the geodesic over
+    the top, not a shorter one round the side: 17.56 rather than 14.52 for
+    bvp_guassian_surf.py. The mesh path finds the shorter one.
+    """
+    if mesh is not None:
+        return mesh_guess(mesh, pa, pb, n)
+    try:
+        return chord_guess(surface, pa, pb, n)
+    except ValueError as error:
+        warnings.warn(f"{error}; using the semicircle guess instead", RuntimeWarning,
+                      stacklevel=2)
+        return semicircle_guess(n=n)
+
+
+def solve_geodesic_bvp(surface, pa, pb, guess=None, tol=1e-5, max_nodes=5000,
+                       epsilon=1e-8, jacobian=True, trace=None, **kwargs):
+    """Solve for the geodesic from pa to pb on t in [0, 1].
+
+    guess is a (t, y) pair as returned by smart_guess, semicircle_guess or
+    line_guess; it defaults to smart_guess. With jacobian=True the analytic fun_jac
+    and bc_jac are passed, so solve_bvp does not finite-difference geode.
+    trace is an optional geodesics.trace.Trace that records every call.
+    Extra keyword arguments go to solve_bvp.
+    """
+    t, y = smart_guess(surface, pa, pb) if guess is None else guess
+    gradF, HF, D3F = (surface.gradF, surface.HF, surface.D3F) if trace is None \
+        else trace.wrap_surface(surface)
+    geode = geodesic_rhs(gradF, HF, epsilon)
+    bc = endpoint_bc(pa, pb)
+    if jacobian:
+        kwargs.setdefault("fun_jac", geodesic_jacobian(gradF, HF, D3F, epsilon))
+        kwargs.setdefault("bc_jac", endpoint_bc_jac)
+    if trace is None:
+        return solve_bvp(geode, bc, t, y, tol=tol, max_nodes=max_nodes, **kwargs)
+    trace.meta.update(solver="bvp", initial_nodes=int(np.size(t)), tol=tol, max_nodes=max_nodes)
+    geode, kwargs["fun_jac"] = trace.wrap_rhs(geode, kwargs.get("fun_jac"))
+    bc, kwargs["bc_jac"] = trace.wrap_bc(bc, kwargs.get("bc_jac"))
+    return trace.record_result(solve_bvp(geode, bc, t, y, tol=tol, max_nodes=max_nodes,
+                                         **kwargs))
@@ -0,0 +1,207 @@
+# On-disk result cache for geodesic solves.
+#
+# Keys are SHA-256 hashes of a JSON description of the problem (surface type
+# and parameters, endpoints, tolerances, ...), so any change to an input gives
+# a new key. Values are dicts of NumPy arrays / floats stored as .npz blobs in
+# a single SQLite file, which copes with hundreds of thousands of entries.
+#
+# GeodesicCache memoizes whole solves on top of this: the solution's dense
+# output is stored as piecewise-polynomial coefficients, so a cache hit gives
+# back a callable sol just like a fresh solve.
+import hashlib
+import inspect
+import io
+import json
+import os
+import sqlite3
+from collections import OrderedDict
+
+import numpy as np
+from scipy.interpolate import PPoly
+from scipy.optimize import OptimizeResult
+
+from .bvp import solve_geodesic_bvp
+from .ivp import solve_geodesic_ivp
+from .shooting import solve_geodesic_shooting
+
+
+def surface_key(surface):
+    """JSON-able identity of a surface: its class name and parameters."""
+    return {"type": type(surface).__name__, "params": surface.params()}
+
+
+def _jsonable(obj):
+    if hasattr(obj, "params") and callable(obj.params):
+        return surface_key(obj)
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"cannot build a cache key from {type(obj).__name__}")
+
+
+def make_key(*parts):
+    """Hash arbitrary key parts (surfaces, arrays, numbers, strings)."""
+    text = json.dumps(parts, default=_jsonable, sort_keys=True)
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+class DiskCache:
+    """Persistent key -> dict-of-arrays store backed by SQLite."""
+
+    def __init__(self, path):
+        self.path = os.fspath(path)
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(self.path)
+        self._db.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value BLOB)")
+        self._db.commit()
+
+    def get(self, key, default=None):
+        row = self._db.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return default
+        with np.load(io.BytesIO(row[0])) as data:
+            return {name: data[name] for name in data.files}
+
+    def set(self, key, value):
+        self.set_many([(key, value)])
+
+    def set_many(self, items):
+        rows = []
+        for key, value in items:
+            buffer = io.BytesIO()
+            np.savez(buffer, **value)
+            rows.append((key, buffer.getvalue()))
+        self._db.executemany("INSERT OR REPLACE INTO results VALUES (?, ?)", rows)
+        self._db.commit()
+
+    def __contains__(self, key):
+        return self._db.execute("SELECT 1 FROM results WHERE key = ?", (key,)).fetchone() is not None
+
+    def __len__(self):
+        return self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def close(self):
+        self._db.close()
+
+
+def dense_to_ppoly(sol):
+    """The dense output of a solve as a PPoly evaluating to shape (n, len(t)).
+
+    Handles solve_bvp splines and solve_ivp output from the explicit
+    Runge-Kutta methods RK23 and RK45 (exactly: their interpolants already
+    are polynomials on each step). Returns None for anything else.
+    """
+    if isinstance(sol, PPoly):
+        return sol
+    interpolants = getattr(sol, "interpolants", None)
+    if not interpolants:
+        return None
+    # On a step, y = y_old + sum_k Q[:, k] h^-k (t - t_old)^(k+1). SciPy does
+    # not export the interpolant classes, so go by their attributes and then
+    # check the result against sol itself: other methods' interpolants (or a
+    # future SciPy's) may carry the same names with another meaning.
+    try:
+        if interpolants[0].t < interpolants[0].t_old:
+            return None
+        degree = interpolants[0].Q.shape[1]
+        # Laid out as solve_bvp's splines: (state, power, interval) with axis=1.
+        c = np.empty((interpolants[0].y_old.size, degree + 1, len(interpolants)))
+        for i, p in enumerate(interpolants):
+            c[:, :degree, i] = (p.Q * p.h ** -np.arange(degree))[:, ::-1]
+            c[:, degree, i] = p.y_old
+        x = np.append([p.t_old for p in interpolants], interpolants[-1].t)
+    except (AttributeError, TypeError, ValueError, IndexError):
+        return None
+    ppoly = PPoly(c, x, extrapolate=True, axis=1)
+    steps = np.unique(np.linspace(0, len(interpolants) - 1, 16).astype(int))
+    t = x[steps] + 0.37 * (x[steps + 1] - x[steps])
+    if not np.allclose(ppoly(t), sol(t), rtol=1e-9, atol=1e-12):
+        return None
+    return ppoly
+
+
+class GeodesicCache:
+    """Memoized solve_geodesic_bvp / solve_geodesic_ivp / solve_geodesic_shooting.
+
+    Results are keyed on the surface, the endpoints (or start point and
+    velocity) and every solver option, defaults included. The maxsize most
+    recent results are kept in memory; with a path they also go to a
+    DiskCache, so later runs start warm. Solves whose dense output
+    dense_to_ppoly cannot store (e.g. method="DOP853") are not cached.
+    Solver options must be JSON-able, so solve_ivp events cannot be passed.
+    """
+
+    def __init__(self, path=None, maxsize=128):
+        self.disk = None if path is None else (path if isinstance(path, DiskCache)
+                                               else DiskCache(path))
+        self.maxsize = maxsize
+        self._memory = OrderedDict()
+        self.hits = self.misses = 0
+
+    def bvp(self, surface, pa, pb, *args, **kwargs):
+        return self._call("bvp", solve_geodesic_bvp, surface, pa, pb, *args, **kwargs)
+
+    def ivp(self, surface, ip, iv, distance, *args, **kwargs):
+        return self._call("ivp", solve_geodesic_ivp, surface, ip, iv, distance, *args, **kwargs)
+
+    def shooting(self, surface, ip, fp, *args, **kwargs):
+        return self._call("shooting", solve_geodesic_shooting, surface, ip, fp, *args, **kwargs)
+
+    def _call(self, kind, solver, *args, **kwargs):
+        bound = inspect.signature(solver).bind(*args, **kwargs)
+        bound.apply_defaults()
+        arguments = {name: np.asarray(value, dtype=float) if name in ("pa", "pb", "ip", "iv", "fp")
+                     else value for name, value in bound.arguments.items() if name != "trace"}
+        key = make_key(kind, arguments)
+
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return self._memory[key]
+        value = None if self.disk is None else self.disk.get(key)
+        if value is not None:
+            self.hits += 1
+            return self._remember(key, _unpack(value))
+
+        self.misses += 1
+        result = solver(*args, **kwargs)
+        ppoly = dense_to_ppoly(result.sol)
+        if ppoly is None:
+            return result
+        result.sol = ppoly
+        if self.disk is not None:
+            self.disk.set(key, _pack(result))
+        return self._remember(key, result)
+
+    def _remember(self, key, result):
+        self._memory[key] = result
+        while len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+        return result
+
+    def __len__(self):
+        return len(self._memory)
+
+    def clear(self):
+        """Forget the in-memory results (the disk store is kept)."""
+        self._memory.clear()
+
+
+def _pack(result):
+    value = {name: np.asarray(item) for name, item in result.items()
+             if name != "sol" and item is not None and not callable(item)}
+    value["sol_c"] = result.sol.c
+    value["sol_x"] = result.sol.x
+    value["sol_axis"] = np.asarray(result.sol.axis)
+    return value
+
+
+def _unpack(value):
+    c, x, axis = value.pop("sol_c"), value.pop("sol_x"), value.pop("sol_axis")
+    result = OptimizeResult({name: item.item() if item.ndim == 0 else item
+                             for name, item in value.items()})
+    result.sol = PPoly.construct_fast(c, x, extrapolate=True, axis=int(axis))
+    return result
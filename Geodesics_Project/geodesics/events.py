@@ -0,0 +1,64 @@
+# solve_ivp events for geodesic IVPs.
+#
+# Each factory returns an event(t, y) for solve_ivp(events=...), which stops
+# the integration (terminal=True) as soon as the geodesic does something
+# interesting, instead of integrating a fixed distance. With unit initial
+# speed t is arc length, so the distance passed to the solver is just an
+# upper bound on the length.
+import numpy as np
+
+
+def _event(fun, terminal, direction):
+    fun.terminal = terminal
+    fun.direction = direction
+    return fun
+
+
+def plane_event(point, normal, terminal=True, direction=0):
+    """Crossing the plane through point with the given normal.
+
+    direction=1 only counts crossings towards +normal, -1 towards -normal.
+    """
+    point = np.asarray(point, dtype=float)
+    normal = np.asarray(normal, dtype=float)
+
+    def crossed_plane(t, y):
+        return np.dot(y[:3] - point, normal)
+
+    return _event(crossed_plane, terminal, direction)
+
+
+def height_event(z, terminal=True, direction=0):
+    """Reaching height z (direction=1: going up, -1: going down)."""
+    def reached_height(t, y):
+        return y[2] - z
+
+    return _event(reached_height, terminal, direction)
+
+
+def closure_event(ip, radius=0.1, t_min=None, terminal=True):
+    """Returning to within radius of the start point ip.
+
+    The event is armed only after t_min (default 4 * radius), so that it
+    does not fire while the ray is still leaving its start.
+    """
+    ip = np.asarray(ip, dtype=float)
+    t_min = 4 * radius if t_min is None else t_min
+
+    def returned(t, y):
+        if t < t_min:
+            return radius
+        return np.linalg.norm(y[:3] - ip) - radius
+
+    return _event(returned, terminal, -1)
+
+
+def box_event(lo, hi, terminal=True):
+    """Leaving the axis-aligned box lo <= X <= hi."""
+    lo = np.asarray(lo, dtype=float)
+    hi = np.asarray(hi, dtype=float)
+
+    def left_box(t, y):
+        return min(np.min(y[:3] - lo), np.min(hi - y[:3]))
+
+    return _event(left_box, terminal, -1)
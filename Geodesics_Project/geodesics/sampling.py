@@ -0,0 +1,87 @@
+# Adaptive output sampling of solved geodesics.
+#
+# Instead of evaluating a dense solution at a fixed linspace, points are
+# placed so that the polyline through them stays within about tol of
+# the curve. The sagitta of a chord of length L is about kappa L^2 / 8, so
+# the solver's step ends are first thinned to spacing sqrt(8 tol / kappa),
+# with kappa estimated from how far the velocity turns over each step; then
+# every chord is bisected until its midpoint lies within tol of the curve.
+# Long chords on straight stretches, short ones in tight turns. Points come
+# out in order, a batch of solver steps at a time, so very long geodesics
+# can be streamed without building the whole array.
+import numpy as np
+
+
+def breakpoints(sol):
+    """The solver's own mesh: PPoly breakpoints or OdeSolution step ends."""
+    return np.asarray(sol.x if hasattr(sol, "x") else sol.ts, dtype=float)
+
+
+def thin(t, y, tol):
+    """Indices of the knots t (states y) to keep for chords within about tol.
+
+    Spreads the estimated sagitta evenly: with step length ds and velocity
+    turning angle dtheta, each step uses sqrt(ds dtheta / (8 tol)) of a
+    chord. Both ends are always kept.
+    """
+    ds = np.linalg.norm(np.diff(y[:3], axis=1), axis=0)
+    v = y[3:] / np.linalg.norm(y[3:], axis=0)
+    dtheta = np.arccos(np.clip(np.sum(v[:, :-1] * v[:, 1:], axis=0), -1, 1))
+    budget = np.floor(np.concatenate(([0], np.cumsum(np.sqrt(ds * dtheta / (8 * tol))))))
+    keep = np.flatnonzero(np.diff(budget)) + 1
+    return np.unique(np.concatenate(([0], keep, [t.size - 1])))
+
+
+def refine(sol, t, tol, max_depth=30):
+    """Bisect the segments between the sorted times t until every chord is within tol.
+
+    Returns (t, y) with y = sol(t) of shape (6, len(t)).
+    """
+    t = np.asarray(t, dtype=float)
+    y = sol(t)
+    todo = np.ones(t.size - 1, dtype=bool)
+    for _ in range(max_depth):
+        seg = np.flatnonzero(todo)
+        if seg.size == 0:
+            break
+        mid = (t[seg] + t[seg + 1]) / 2
+        y_mid = sol(mid)
+        sagitta = np.linalg.norm(y_mid[:3] - (y[:3, seg] + y[:3, seg + 1]) / 2, axis=0)
+        bad = sagitta > tol
+        # A split segment becomes two segments, both still to be checked.
+        split = np.zeros(todo.size, dtype=bool)
+        split[seg[bad]] = True
+        t = np.insert(t, seg[bad] + 1, mid[bad])
+        y = np.insert(y, seg[bad] + 1, y_mid[:, bad], axis=1)
+        todo = np.repeat(split, np.where(split, 2, 1))
+    return t, y
+
+
+def iter_adaptive_samples(sol, tol=1e-3, t0=None, t1=None, batch=512):
+    """Yield (t, y) chunks of adaptive samples of sol on [t0, t1], in order.
+
+    sol is the dense output of a solve (OdeSolution, a solve_bvp spline or
+    a PPoly from geodesics.cache / geodesics.jit); t0 and t1 default to its
+    whole range. Each chunk covers batch solver steps; the first chunk
+    starts with t0 and later chunks do not repeat their left end.
+    """
+    knots = breakpoints(sol)
+    t0 = knots[0] if t0 is None else t0
+    t1 = knots[-1] if t1 is None else t1
+    lo, hi = min(t0, t1), max(t0, t1)
+    knots = np.concatenate(([lo], knots[(knots > lo) & (knots < hi)], [hi]))
+    if t1 < t0:
+        knots = knots[::-1]
+    for start in range(0, max(knots.size - 1, 1), batch):
+        t = knots[start:start + batch + 1]
+        t, y = refine(sol, t[thin(t, sol(t), tol)], tol)
+        if start:
+            t, y = t[1:], y[:, 1:]
+        yield t, y
+
+
+def adaptive_samples(sol, tol=1e-3, t0=None, t1=None):
+    """All of iter_adaptive_samples at once: (t, y) with y of shape (6, m)."""
+    chunks = list(iter_adaptive_samples(sol, tol, t0, t1))
+    return (np.concatenate([t for t, _ in chunks]),
+            np.concatenate([y for _, y in chunks], axis=1))
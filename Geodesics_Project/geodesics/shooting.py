@@ -0,0 +1,98 @@
+# Shooting method: find the initial velocity that reaches a target point.
+#
+# The geodesic is parametrized on t in [0, 1] with initial velocity w in the
+# tangent plane at ip, so it ends exactly at X(1) and its length is |w|. The
+# exact sensitivity dX(1)/dw comes from integrating the variational
+# equations (Jacobi fields) alongside the geodesic, and w is found by
+# Gauss-Newton with Levenberg-Marquardt damping.
+import numpy as np
+from scipy.integrate import solve_ivp
+from scipy.optimize import OptimizeResult
+
+from .ode import geodesic_jacobian, geodesic_rhs
+
+
+def tangent_basis(surface, p):
+    """Two orthonormal tangent vectors at the surface point p, shape (2, 3)."""
+    n = np.asarray(surface.gradF(*p), dtype=float)
+    n = n / np.linalg.norm(n)
+    helper = np.eye(3)[np.argmin(np.abs(n))]
+    e1 = np.cross(n, helper)
+    e1 /= np.linalg.norm(e1)
+    return np.array([e1, np.cross(n, e1)])
+
+
+def shoot(surface, ip, w, basis, rtol=1e-10, atol=1e-10, epsilon=0):
+    """Integrate the geodesic with X(0) = ip, Xdot(0) = w over t in [0, 1].
+
+    The Jacobi fields for perturbing w along each row of basis are carried
+    along. Returns (solve_ivp result, dX(1)/dc of shape (3, len(basis))),
+    where c are the coordinates of w in basis.
+    """
+    geode = geodesic_rhs(surface.gradF, surface.HF, epsilon)
+    jac = geodesic_jacobian(surface.gradF, surface.HF, surface.D3F, epsilon)
+    k = len(basis)
+
+    def augmented(t, z):
+        y = z[:6]
+        V = z[6:].reshape(6, k)
+        return np.concatenate((geode(t, y), (jac(t, y) @ V).ravel()))
+
+    V0 = np.zeros((6, k))
+    V0[3:] = np.transpose(basis)
+    z0 = np.concatenate((ip, w, V0.ravel()))
+    u = solve_ivp(augmented, [0, 1], z0, dense_output=True, rtol=rtol, atol=atol)
+    return u, u.y[6:, -1].reshape(6, k)[:3]
+
+
+def solve_geodesic_shooting(surface, ip, fp, w0=None, tol=1e-10, max_iter=50,
+                            rtol=1e-10, atol=1e-10, epsilon=0):
+    """Geodesic from ip to fp by shooting.
+
+    w0 is the starting guess for the initial velocity (defaults to the chord
+    fp - ip projected onto the tangent plane). Returns an OptimizeResult with
+    iv (unit initial direction), length, w, sol (dense solution on [0, 1];
+    rows 0-5 are the geodesic state), success, nit, nfev and residual
+    (|X(1) - fp|).
+    """
+    ip = np.asarray(ip, dtype=float)
+    fp = np.asarray(fp, dtype=float)
+    basis = tangent_basis(surface, ip)
+    c = basis @ (fp - ip if w0 is None else np.asarray(w0, dtype=float))
+    if w0 is None:
+        # The projected chord is shorter than the geodesic; start at the
+        # chord length instead. A chord along the normal (antipodal points
+        # on a sphere) projects to nothing, so any tangent direction will do.
+        chord = np.linalg.norm(fp - ip)
+        if np.linalg.norm(c) <= 1e-8 * chord:
+            c = np.array([1.0, 0.0])
+        c *= chord / np.linalg.norm(c)
+
+    u, J = shoot(surface, ip, c @ basis, basis, rtol, atol, epsilon)
+    r = u.y[:3, -1] - fp
+    lam = 1e-3
+    nfev = 1
+    nit = 0
+    while np.linalg.norm(r) > tol and nit < max_iter:
+        nit += 1
+        JtJ = J.T @ J
+        step = np.linalg.solve(JtJ + lam * np.diag(np.diag(JtJ)), -J.T @ r)
+        u_new, J_new = shoot(surface, ip, (c + step) @ basis, basis, rtol, atol, epsilon)
+        nfev += 1
+        r_new = u_new.y[:3, -1] - fp
+        if u_new.success and np.linalg.norm(r_new) < np.linalg.norm(r):
+            c, u, J, r = c + step, u_new, J_new, r_new
+            lam = max(lam / 10, 1e-12)
+        else:
+            lam *= 10
+            if lam > 1e12:
+                break
+
+    w = c @ basis
+    residual = np.linalg.norm(r)
+    success = bool(u.success and residual <= tol)
+    return OptimizeResult(
+        w=w, iv=w / np.linalg.norm(w), length=np.linalg.norm(w), sol=u.sol,
+        success=success, nit=nit, nfev=nfev, residual=residual,
+        message="converged" if success else "residual did not reach tol",
+    )
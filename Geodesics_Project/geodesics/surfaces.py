@@ -0,0 +1,216 @@
+# Implicit surfaces F(x, y, z) = 0 used by the geodesic solvers.
+#
+# gradF returns shape (3, ...), HF shape (3, 3, ...) and D3F shape
+# (3, 3, 3, ...), so the same surface can be evaluated at one point or on a
+# whole (3, N) mesh.
+import numpy as np
+
+
+class Surface:
+    """Base class: subclasses provide F, gradF, HF and optionally D3F and height.
+
+    graph is True when the whole surface is the graph of height, so every
+    (x, y) has exactly one surface point above it.
+    """
+
+    graph = False
+
+    def F(self, x, y, z):
+        raise NotImplementedError
+
+    def gradF(self, x, y, z):
+        raise NotImplementedError
+
+    def HF(self, x, y, z):
+        raise NotImplementedError
+
+    def D3F(self, x, y, z, h=1e-5):
+        """Third derivatives T[i, j, k] of F.
+
+        The default differentiates HF by central differences; surfaces with
+        closed-form third derivatives override it.
+        """
+        X = np.array(np.broadcast_arrays(x, y, z), dtype=float)
+        T = np.empty((3, 3, 3) + X.shape[1:])
+        for k in range(3):
+            step = np.zeros_like(X)
+            step[k] = h
+            Hp = np.broadcast_to(self.HF(*(X + step)), (3, 3) + X.shape[1:])
+            Hm = np.broadcast_to(self.HF(*(X - step)), (3, 3) + X.shape[1:])
+            T[:, :, k] = (Hp - Hm) / (2 * h)
+        return T
+
+    def height(self, x, y):
+        """Closed-form z on the surface above (x, y), when there is one."""
+        raise NotImplementedError(f"{type(self).__name__} has no height function")
+
+    def point(self, x, y):
+        """The surface point above (x, y) as a length-3 array."""
+        return np.array([x, y, self.height(x, y)], dtype=float)
+
+    def params(self):
+        """Parameters that identify this surface (used in reprs and keys)."""
+        return {}
+
+    def __repr__(self):
+        args = ", ".join(f"{k}={v!r}" for k, v in self.params().items())
+        return f"{type(self).__name__}({args})"
+
+
+class Ellipsoid(Surface):
+    """x^2/a^2 + y^2/b^2 + z^2/c^2 - 1 = 0; height is the upper half."""
+
+    def __init__(self, a=3.0, b=2.0, c=1.0):
+        self.a, self.b, self.c = float(a), float(b), float(c)
+
+    def F(self, x, y, z):
+        return x**2 / self.a**2 + y**2 / self.b**2 + z**2 / self.c**2 - 1
+
+    def gradF(self, x, y, z):
+        x, y, z = np.broadcast_arrays(x, y, z)
+        return np.stack((2 * x / self.a**2, 2 * y / self.b**2, 2 * z / self.c**2))
+
+    def HF(self, x, y, z):
+        shape = np.broadcast(x, y, z).shape
+        H = np.zeros((3, 3) + shape)
+        H[0, 0] = 2 / self.a**2
+        H[1, 1] = 2 / self.b**2
+        H[2, 2] = 2 / self.c**2
+        return H
+
+    def D3F(self, x, y, z):
+        return np.zeros((3, 3, 3) + np.broadcast(x, y, z).shape)
+
+    def height(self, x, y):
+        return np.sqrt(1 - x**2 / self.a**2 - y**2 / self.b**2) * self.c
+
+    def params(self):
+        return {"a": self.a, "b": self.b, "c": self.c}
+
+
+class Sphere(Ellipsoid):
+    """Sphere of radius R centred at the origin."""
+
+    def __init__(self, R=3.0):
+        super().__init__(R, R, R)
+        self.R = float(R)
+
+    def params(self):
+        return {"R": self.R}
+
+
+class GraphSurface(Surface):
+    """Surface z = f(x, y), written implicitly as F = f(x, y) - z = 0.
+
+    Subclasses implement derivatives(x, y), returning
+    (f, fx, fy, fxx, fxy, fyy), and optionally third_derivatives(x, y),
+    returning (fxxx, fxxy, fxyy, fyyy).
+    """
+
+    graph = True
+
+    def derivatives(self, x, y):
+        raise NotImplementedError
+
+    def third_derivatives(self, x, y):
+        raise NotImplementedError
+
+    def height(self, x, y):
+        return self.derivatives(x, y)[0]
+
+    def F(self, x, y, z):
+        return self.height(x, y) - z
+
+    def gradF(self, x, y, z):
+        _, fx, fy, _, _, _ = self.derivatives(*np.broadcast_arrays(x, y, z)[:2])
+        return np.stack((fx, fy, -np.ones_like(fx)))
+
+    def HF(self, x, y, z):
+        _, _, _, fxx, fxy, fyy = self.derivatives(*np.broadcast_arrays(x, y, z)[:2])
+        zero = np.zeros_like(fxx)
+        return np.array([[fxx, fxy, zero], [fxy, fyy, zero], [zero, zero, zero]])
+
+    def D3F(self, x, y, z):
+        try:
+            fxxx, fxxy, fxyy, fyyy = self.third_derivatives(*np.broadcast_arrays(x, y, z)[:2])
+        except NotImplementedError:
+            return super().D3F(x, y, z)
+        T = np.zeros((3, 3, 3) + np.shape(fxxx))
+        T[0, 0, 0] = fxxx
+        T[0, 0, 1] = T[0, 1, 0] = T[1, 0, 0] = fxxy
+        T[0, 1, 1] = T[1, 0, 1] = T[1, 1, 0] = fxyy
+        T[1, 1, 1] = fyyy
+        return T
+
+
+class GaussianBump(GraphSurface):
+    """The "lonely mountain" z = a * exp(-x^2 - y^2)."""
+
+    def __init__(self, a=3.0):
+        self.a = float(a)
+
+    def derivatives(self, x, y):
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        f = self.a * np.exp(-x**2 - y**2)
+        fx = -2 * x * f
+        fy = -2 * y * f
+        fxx = 2 * (2 * x**2 - 1) * f
+        fxy = 4 * x * y * f
+        fyy = 2 * (2 * y**2 - 1) * f
+        return f, fx, fy, fxx, fxy, fyy
+
+    def third_derivatives(self, x, y):
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        f = self.a * np.exp(-x**2 - y**2)
+        fxxx = -4 * x * (2 * x**2 - 3) * f
+        fxxy = -2 * y * (4 * x**2 - 2) * f
+        fxyy = -2 * x * (4 * y**2 - 2) * f
+        fyyy = -4 * y * (2 * y**2 - 3) * f
+        return fxxx, fxxy, fxyy, fyyy
+
+    def params(self):
+        return {"a": self.a}
+
+
+class ManyMountain(GraphSurface):
+    """z = sin(x) cos(y) / (1 + alpha x^2 + beta y^2), from ivp_many_mountain.py."""
+
+    def __init__(self, alpha=0.02, beta=0.03):
+        self.alpha = float(alpha)
+        self.beta = float(beta)
+
+    def _parts(self, x, y):
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        sx, cx, sy, cy = np.sin(x), np.cos(x), np.sin(y), np.cos(y)
+        q = 1 + self.alpha * x**2 + self.beta * y**2
+        qx, qy = 2 * self.alpha * x, 2 * self.beta * y
+        return sx, cx, sy, cy, q, qx, qy
+
+    def derivatives(self, x, y):
+        # f = s / q, differentiated through f q = s so q is formed only once.
+        sx, cx, sy, cy, q, qx, qy = self._parts(x, y)
+        qxx, qyy = 2 * self.alpha, 2 * self.beta
+        s = sx * cy
+        f = s / q
+        fx = (cx * cy - f * qx) / q
+        fy = (-sx * sy - f * qy) / q
+        fxx = (-s - 2 * fx * qx - f * qxx) / q
+        fxy = (-cx * sy - fx * qy - fy * qx) / q
+        fyy = (-s - 2 * fy * qy - f * qyy) / q
+        return f, fx, fy, fxx, fxy, fyy
+
+    def third_derivatives(self, x, y):
+        sx, cx, sy, cy, q, qx, qy = self._parts(x, y)
+        qxx, qyy = 2 * self.alpha, 2 * self.beta
+        _, fx, fy, fxx, fxy, fyy = self.derivatives(x, y)
+        fxxx = (-cx * cy - 3 * fxx * qx - 3 * fx * qxx) / q
+        fxxy = (sx * sy - fxx * qy - 2 * fxy * qx - fy * qxx) / q
+        fxyy = (-cx * cy - fyy * qx - 2 * fxy * qy - fx * qyy) / q
+        fyyy = (sx * sy - 3 * fyy * qy - 3 * fy * qyy) / q
+        return fxxx, fxxy, fxyy, fyyy
+
+    def params(self):
+        return {"alpha": self.alpha, "beta": self.beta}
@@ -0,0 +1,268 @@
+# Many independent BVP solves over a grid of start points (peak_map.py).
+#
+# Points are solved in a process pool; each worker builds the surface's RHS
+# and Jacobian once and reuses them for every point it is handed. Results can
+# be cached on disk, so rerunning a map or refining its grid only solves the
+# points that have not been seen before.
+#
+# In continuation mode the points are visited in serpentine order and each
+# solve is seeded with the converged mesh of the previous (neighbouring)
+# point, shifted so its ends sit on the new endpoints. A chain can follow
+# that seed onto a geodesic that is not the shortest (the long way round a
+# bump), so a warm result longer than the projected chord between the same
+# points is re-solved cold and the shorter of the two kept. That check is
+# not a proof of being shortest (see sweep_pairs), so continuation is
+# opt-in: a speed-up for maps where a near-shortest branch is good enough.
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from scipy.integrate import solve_bvp
+
+from .bvp import (chord_guess, endpoint_bc, endpoint_bc_jac, semicircle_guess, smart_guess,
+                  solve_geodesic_bvp)
+from .cache import DiskCache, make_key
+from .length import arc_length
+from .ode import geodesic_jacobian, geodesic_rhs
+from .trace import Trace
+
+SUMMARY_FIELDS = ("success", "max_z", "length", "niter", "nodes")
+
+_worker = {}
+
+
+def init_worker(surface, guess, tol, max_nodes, epsilon, trace_dir=None):
+    """Set up this process to solve pairs (see solve_chain), as sweep_pairs does."""
+    _worker.update(
+        geode=geodesic_rhs(surface.gradF, surface.HF, epsilon),
+        jac=geodesic_jacobian(surface.gradF, surface.HF, surface.D3F, epsilon),
+        surface=surface, guess=guess, tol=tol, max_nodes=max_nodes, epsilon=epsilon,
+        trace_dir=trace_dir,
+    )
+
+
+def _cold_guess(pa, pb):
+    guess = _worker["guess"]
+    if isinstance(guess, str):
+        return smart_guess(_worker["surface"], pa, pb)
+    return guess
+
+
+def summarize(u, n=100):
+    """Highest point and arc length of a BVP solution, as in peak_map.py.
+
+    Also records the solver's iteration count and final mesh size.
+    """
+    stats = {"niter": u.niter, "nodes": u.x.size}
+    if not u.success:
+        return {"success": 0.0, "max_z": np.nan, "length": np.nan, **stats}
+    positions = u.sol(np.linspace(0, 1, n))[:3]
+    return {"success": 1.0, "max_z": positions[2].max(), "length": arc_length(u.sol)[0], **stats}
+
+
+def serpentine_order(shape):
+    """Flat indices of a 2-D grid, row by row with every other row reversed.
+
+    Consecutive indices are always grid neighbours.
+    """
+    rows, cols = shape
+    order = np.arange(rows * cols).reshape(rows, cols)
+    order[1::2] = order[1::2, ::-1]
+    return order.ravel()
+
+
+def seed_mesh(t, n_cold):
+    """Mesh to restart from: a converged mesh t, halved once it outgrows n_cold.
+
+    solve_bvp only ever adds nodes, so reusing meshes unchanged would let
+    refinement accumulate along a chain of warm starts.
+    """
+    if t.size <= n_cold:
+        return t
+    return np.append(t[:-1:2], t[-1])
+
+
+def warm_guess(sol, t, pa, pb):
+    """Sample a converged solution on the mesh t, shifted to run from pa to pb."""
+    y = sol(t)
+    da = pa - y[:3, 0]
+    db = pb - y[:3, -1]
+    y[:3] += (1 - t) * da[:, None] + t * db[:, None]
+    y[3:] += (db - da)[:, None]
+    return t, y
+
+
+def _solve(pa, pb, guess, index=None, attempt="cold"):
+    if _worker["trace_dir"] is not None:
+        return _solve_traced(pa, pb, guess, index, attempt)
+    t, y = guess
+    return solve_bvp(_worker["geode"], endpoint_bc(pa, pb), t, y, tol=_worker["tol"],
+                     max_nodes=_worker["max_nodes"], fun_jac=_worker["jac"],
+                     bc_jac=endpoint_bc_jac)
+
+
+def _solve_traced(pa, pb, guess, index, attempt):
+    trace = Trace(index=index, attempt=attempt, pa=pa.tolist(), pb=pb.tolist())
+    u = solve_geodesic_bvp(_worker["surface"], pa, pb, guess, tol=_worker["tol"],
+                           max_nodes=_worker["max_nodes"], epsilon=_worker["epsilon"],
+                           trace=trace)
+    trace.to_json(os.path.join(_worker["trace_dir"], f"{index:06d}-{attempt}.json"))
+    return u
+
+
+def _solve_pair(pair):
+    i, pa, pb = pair
+    return summarize(_solve(pa, pb, _cold_guess(pa, pb), i))
+
+
+def chord_bound(surface, pa, pb):
+    """Length of the projected chord from pa to pb (inf if it cannot be projected).
+
+    The chord is a curve on the surface between the two points, so no
+    shortest geodesic between them is longer.
+    """
+    try:
+        y = chord_guess(surface, pa, pb)[1]
+    except ValueError:
+        return np.inf
+    return np.sum(np.linalg.norm(np.diff(y[:3], axis=1), axis=0))
+
+
+def solve_chain(pairs):
+    """Summaries of the (i, pa, pb) pairs, solved in order as one continuation chain.
+
+    Each pair is seeded from the last success, falling back to the cold
+    guess if the warm start does not converge, or lands on a geodesic
+    longer than the projected chord (or there is no chord to compare with)
+    and a cold solve finds a shorter one. Runs in a process set up by
+    init_worker.
+    """
+    out = []
+    # The last converged solution and the node count of the cold guess its
+    # chain started from.
+    seed = None
+    for i, pa, pb in pairs:
+        u = None
+        if seed is not None:
+            prev, n_cold = seed
+            t = seed_mesh(prev.x, n_cold)
+            u = _solve(pa, pb, warm_guess(prev.sol, t, pa, pb), i, "warm")
+            bound = chord_bound(_worker["surface"], pa, pb)
+            # With no chord to compare with (bound is inf), only a cold
+            # solve can tell whether the warm one went the long way round.
+            if u.success and not arc_length(u.sol)[0] <= (1 + 1e-3) * bound < np.inf:
+                cold = _solve(pa, pb, _cold_guess(pa, pb), i)
+                cold.niter += u.niter
+                if cold.success and arc_length(cold.sol)[0] < arc_length(u.sol)[0]:
+                    u = cold
+                else:
+                    u.niter = cold.niter
+        if u is None or not u.success:
+            cold_guess = _cold_guess(pa, pb)
+            n_cold = cold_guess[0].size
+            cold = _solve(pa, pb, cold_guess, i)
+            if u is not None:
+                cold.niter += u.niter
+            u = cold
+        if u.success:
+            seed = (u, n_cold)
+        out.append(summarize(u))
+    return out
+
+
+def sweep_pairs(surface, starts, ends, tol=1e-5, max_nodes=5000, epsilon=1e-8,
+                guess=None, processes=None, cache=None, chunksize=8,
+                continuation=False, trace_dir=None):
+    """Solve the BVP from each starts[i] to ends[i] (both shape (M, 3)).
+
+    Returns a dict mapping each of SUMMARY_FIELDS to an array of length M.
+    processes=1 runs in this process; otherwise a ProcessPoolExecutor with
+    that many workers (None: one per CPU) is used. cache is a DiskCache or a
+    path to one; cached points are not solved again.
+
+    guess is a (t, y) pair shared by every pair (default: the semicircle),
+    or "smart" to build a smart_guess from each pair's own endpoints.
+
+    With continuation=True consecutive pairs are assumed to be neighbours:
+    the pairs are cut into one contiguous chain per worker and each solve is
+    warm-started from the previous converged solution in its chain. Where
+    several geodesics join the same endpoints, continuation follows one
+    branch smoothly; a result longer than the projected chord (see
+    chord_bound) is therefore re-solved cold and the shorter one kept. That
+    catches the long way round, but not a wrong branch that is still shorter
+    than the chord (either side of a bump whose top the chord crosses): on
+    the 30 x 30 peak_map grid 18 points keep a longer branch, by up to 0.33.
+    Continuation is therefore off by default; leave it off where only the
+    shortest geodesic will do. Where the chord cannot be projected at all
+    (near-antipodal points on a sphere) there is nothing to compare with,
+    and the warm result is always checked against a cold solve.
+
+    With trace_dir, every solve that is not answered from the cache writes
+    a geodesics.trace.Trace to trace_dir/<i>-cold.json (or -warm.json for
+    a warm start), i being the pair's index.
+    """
+    starts = np.asarray(starts, dtype=float)
+    ends = np.broadcast_to(np.asarray(ends, dtype=float), starts.shape)
+    guess = semicircle_guess() if guess is None else guess
+    if cache is not None and not isinstance(cache, DiskCache):
+        cache = DiskCache(cache)
+
+    results = [None] * len(starts)
+    keys = [None] * len(starts)
+    todo = []
+    for i, (pa, pb) in enumerate(zip(starts, ends)):
+        if cache is not None:
+            keys[i] = make_key("bvp-summary-v3", surface, pa, pb, tol, max_nodes,
+                               epsilon, guess if isinstance(guess, str) else guess[1],
+                               continuation)
+            results[i] = cache.get(keys[i])
+        if results[i] is None:
+            todo.append(i)
+
+    pairs = [(i, starts[i], ends[i]) for i in todo]
+    if trace_dir is not None:
+        os.makedirs(trace_dir, exist_ok=True)
+    initargs = (surface, guess, tol, max_nodes, epsilon, trace_dir)
+    if continuation:
+        n_chains = 1 if processes == 1 else (processes or os.cpu_count() or 1)
+        tasks = [list(c) for c in np.array_split(np.arange(len(pairs)), n_chains) if len(c)]
+        tasks = [[pairs[k] for k in chain] for chain in tasks]
+        solve, chunksize = solve_chain, 1
+    else:
+        tasks, solve = pairs, _solve_pair
+    if processes == 1:
+        init_worker(*initargs)
+        solved = list(map(solve, tasks))
+    else:
+        with ProcessPoolExecutor(processes, initializer=init_worker,
+                                 initargs=initargs) as pool:
+            solved = list(pool.map(solve, tasks, chunksize=chunksize))
+    if continuation:
+        solved = [summary for chain in solved for summary in chain]
+
+    for i, summary in zip(todo, solved):
+        results[i] = summary
+    if cache is not None and todo:
+        cache.set_many((keys[i], results[i]) for i in todo)
+
+    return {name: np.array([float(r[name]) for r in results]) for name in SUMMARY_FIELDS}
+
+
+def sweep_grid(surface, X, Y, target, continuation=False, **kwargs):
+    """sweep_pairs from every surface point above the (X, Y) grid to target.
+
+    With continuation=True the grid is traversed in serpentine order so each
+    solve is warm-started from a neighbour. The returned arrays have the
+    shape of X.
+    """
+    X, Y = np.broadcast_arrays(X, Y)
+    order = serpentine_order(X.shape) if continuation else np.arange(X.size)
+    x, y = X.ravel()[order], Y.ravel()[order]
+    starts = np.column_stack((x, y, surface.height(x, y)))
+    out = sweep_pairs(surface, starts, target, continuation=continuation, **kwargs)
+    result = {}
+    for name, values in out.items():
+        result[name] = np.empty(X.size)
+        result[name][order] = values
+        result[name] = result[name].reshape(X.shape)
+    return result
@@ -0,0 +1,139 @@
+# Surfaces compiled from a SymPy expression.
+#
+# F (or a height f, with F = f - z) is differentiated symbolically up to
+# third order. Each derivative order becomes one generated NumPy function
+# with common subexpressions eliminated. The generated source is cached on
+# disk, keyed by the expression text and parameters, the generator version
+# and the installed SymPy version, so SymPy only runs on a cache miss. If
+# the expression is given as a string, a cache hit does not even import
+# SymPy (its version comes from the package metadata).
+import hashlib
+import importlib.metadata
+import itertools
+import json
+import os
+
+import numpy as np
+
+from .surfaces import Surface
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+DEFAULT_CACHE_DIR = os.path.join(".geodesics_cache", "symbolic")
+
+# Bump when _generate changes what it emits, so stale cached modules are not reused.
+_GENERATOR_VERSION = 1
+
+# Unique index tuples of each derivative order, in the order they are emitted.
+_ORDERS = [list(itertools.combinations_with_replacement(range(3), k)) for k in range(4)]
+
+
+def _generate(expr, params):
+    import sympy
+
+    x, y, z = sympy.symbols("x y z")
+    names = {"x": x, "y": y, "z": z, **{k: sympy.Symbol(k) for k in params}}
+    expr = sympy.sympify(expr, locals=names)
+    expr = expr.subs({names[k]: v for k, v in params.items()})
+    extra = expr.free_symbols - {x, y, z}
+    if extra:
+        raise ValueError(f"unbound symbols in surface expression: {sorted(map(str, extra))}")
+
+    printer = sympy.printing.numpy.NumPyPrinter()
+    variables = (x, y, z)
+    lines = ["import numpy", ""]
+    for order, indices in enumerate(_ORDERS):
+        terms = [expr.diff(*[variables[i] for i in idx]) if idx else expr for idx in indices]
+        replacements, reduced = sympy.cse(terms, optimizations="basic")
+        lines.append(f"def order{order}(x, y, z):")
+        for symbol, value in replacements:
+            lines.append(f"    {symbol} = {printer.doprint(value)}")
+        lines.append(f"    return ({', '.join(printer.doprint(t) for t in reduced)},)")
+        lines.append("")
+    return "\n".join(lines)
+
+
+def compile_surface_source(expr, params=None, cache_dir=DEFAULT_CACHE_DIR):
+    """Generated module source for F = expr, reading or filling the disk cache.
+
+    The cached files are executed as Python by SymbolicSurface, so cache_dir
+    (by default relative to the working directory) must be trusted.
+    """
+    params = dict(params or {})
+    text = expr if isinstance(expr, str) else str(expr)
+    versions = [_GENERATOR_VERSION, importlib.metadata.version("sympy")]
+    key = hashlib.sha256(json.dumps([text, params, versions], sort_keys=True).encode()).hexdigest()
+    path = os.path.join(cache_dir, f"{key}.py") if cache_dir else None
+    if path and os.path.exists(path):
+        with open(path) as fh:
+            return fh.read()
+    source = _generate(expr, params)
+    if path:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as fh:
+            fh.write(source)
+        os.replace(tmp, path)
+    return source
+
+
+class SymbolicSurface(Surface):
+    """Implicit surface F(x, y, z) = expr, compiled from SymPy.
+
+    expr is a SymPy expression or a string in x, y and z; any other symbols
+    are filled in from params. With jit=True the generated functions are
+    also compiled with numba when it is installed. graph=True declares expr
+    to be f(x, y) - z, which gives the surface a height (see from_height).
+    """
+
+    def __init__(self, expr, params=None, cache_dir=DEFAULT_CACHE_DIR, jit=False, graph=False):
+        self.expr = expr if isinstance(expr, str) else str(expr)
+        self.values = dict(params or {})
+        self.graph = bool(graph)
+        namespace = {}
+        exec(compile_surface_source(expr, self.values, cache_dir), namespace)
+        self._orders = [namespace[f"order{k}"] for k in range(4)]
+        if jit and numba is not None:
+            self._orders = [numba.njit(f) for f in self._orders]
+
+    @classmethod
+    def from_height(cls, f, params=None, **kwargs):
+        """The graph z = f(x, y), as F = f(x, y) - z."""
+        return cls(f"({f}) - z", params, graph=True, **kwargs)
+
+    def _terms(self, order, x, y, z):
+        x, y, z = (np.asarray(v, dtype=float) for v in np.broadcast_arrays(x, y, z))
+        return [np.broadcast_to(t, x.shape) for t in self._orders[order](x, y, z)]
+
+    def F(self, x, y, z):
+        return self._terms(0, x, y, z)[0]
+
+    def gradF(self, x, y, z):
+        return np.stack(self._terms(1, x, y, z))
+
+    def HF(self, x, y, z):
+        return self._assemble(2, self._terms(2, x, y, z))
+
+    def D3F(self, x, y, z):
+        return self._assemble(3, self._terms(3, x, y, z))
+
+    def height(self, x, y):
+        if not self.graph:
+            return super().height(x, y)
+        return self.F(x, y, 0.0)
+
+    @staticmethod
+    def _assemble(order, terms):
+        out = np.empty((3,) * order + terms[0].shape)
+        for idx, term in zip(_ORDERS[order], terms):
+            for perm in set(itertools.permutations(idx)):
+                out[perm] = term
+        return out
+
+    def params(self):
+        if self.graph:
+            return {"expr": self.expr, **self.values, "graph": True}
+        return {"expr": self.expr, **self.values}
@@ -0,0 +1,140 @@
+# Per-solve instrumentation of the geodesic solvers.
+#
+# Pass trace=Trace() to solve_geodesic_bvp / solve_geodesic_ivp (or a
+# trace_dir to sweep_pairs) and every call of gradF, HF, the RHS geode, its
+# Jacobian and the boundary conditions is recorded with its batch size (the
+# number of points evaluated at once) and wall time. Times are inclusive:
+# geode's time contains the gradF and HF calls it makes. Without a trace
+# nothing is wrapped, so the solvers run exactly as before.
+#
+# solve_bvp evaluates the Jacobian once per Newton step on the whole
+# current mesh (m points) and then on the m - 1 collocation midpoints, so
+# the Jacobian batch sizes give the mesh size at every step; mesh_history
+# groups them into refinement iterations.
+import csv
+import json
+import time
+
+import numpy as np
+
+
+def _points(args):
+    # gradF(x, y, z), HF(x, y, z): one point per element of x.
+    return int(np.size(args[0]))
+
+
+def _columns(args):
+    # geode(t, y), jac(t, y): y is (6,) or (6, m).
+    y = args[-1]
+    return int(np.shape(y)[-1]) if np.ndim(y) > 1 else 1
+
+
+def _single(args):
+    return 1
+
+
+class Trace:
+    """Call log of one solve: names, batch sizes and wall times."""
+
+    def __init__(self, **meta):
+        self.meta = dict(meta)
+        self.names = []
+        self.sizes = []
+        self.seconds = []
+
+    def wrap(self, name, func, size=_points):
+        """func, recording each call as (name, size(args), seconds)."""
+        names, sizes, seconds = self.names, self.sizes, self.seconds
+        clock = time.perf_counter
+
+        def traced(*args):
+            start = clock()
+            out = func(*args)
+            seconds.append(clock() - start)
+            names.append(name)
+            sizes.append(size(args))
+            return out
+        return traced
+
+    def wrap_surface(self, surface):
+        """Traced (gradF, HF, D3F) of a surface."""
+        return (self.wrap("gradF", surface.gradF), self.wrap("HF", surface.HF),
+                self.wrap("D3F", surface.D3F))
+
+    def wrap_rhs(self, geode, jac=None):
+        """Traced geode and (if given) its Jacobian."""
+        geode = self.wrap("geode", geode, _columns)
+        return geode if jac is None else (geode, self.wrap("jac", jac, _columns))
+
+    def wrap_bc(self, bc, bc_jac=None):
+        """Traced boundary conditions and (if given) their Jacobian."""
+        bc = self.wrap("bc", bc, _single)
+        return bc if bc_jac is None else (bc, self.wrap("bc_jac", bc_jac, _single))
+
+    def record_result(self, result):
+        """Keep the solver's outcome (status, message, iterations, nodes, ...)."""
+        for key in ("success", "status", "message", "niter", "nfev", "njev", "nlu"):
+            if key in result:
+                self.meta[key] = _plain(result[key])
+        if "x" in result:
+            self.meta["nodes"] = int(result.x.size)
+        return result
+
+    def summary(self):
+        """Per name: calls, points evaluated, largest batch and total seconds."""
+        out = {}
+        for name, size, seconds in zip(self.names, self.sizes, self.seconds):
+            row = out.setdefault(name, {"calls": 0, "points": 0, "max_batch": 0, "seconds": 0.0})
+            row["calls"] += 1
+            row["points"] += size
+            row["max_batch"] = max(row["max_batch"], size)
+            row["seconds"] += seconds
+        return out
+
+    def mesh_history(self):
+        """[(nodes, newton_steps), ...]: the mesh size at each refinement iteration.
+
+        Read off the Jacobian calls of a solve_bvp solve; empty otherwise.
+        """
+        history = []
+        previous = None
+        for name, size in zip(self.names, self.sizes):
+            if name != "jac":
+                continue
+            if previous is not None and size == previous - 1:
+                previous = None  # the midpoint call of the same Newton step
+                continue
+            previous = size
+            if history and history[-1][0] == size:
+                history[-1][1] += 1
+            else:
+                history.append([size, 1])
+        return [tuple(row) for row in history]
+
+    def to_dict(self):
+        return {"meta": self.meta, "summary": self.summary(),
+                "mesh_history": self.mesh_history(),
+                "calls": [list(row) for row in zip(self.names, self.sizes, self.seconds)]}
+
+    def to_json(self, path):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=1)
+
+    def to_csv(self, path):
+        """One row per call: index, name, batch size, seconds."""
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["call", "name", "size", "seconds"])
+            writer.writerows((i, *row) for i, row in
+                             enumerate(zip(self.names, self.sizes, self.seconds)))
+
+    def __len__(self):
+        return len(self.names)
+
+    def __repr__(self):
+        calls = ", ".join(f"{name}: {row['calls']}" for name, row in self.summary().items())
+        return f"Trace({calls})"
+
+
+def _plain(value):
+    return value.item() if isinstance(value, np.generic) else value
@@ -1,69 +1,28 @@
 from numpy import *
-from scipy.integrate import solve_ivp
-from scipy.optimize import minimize
 import matplotlib.pyplot as plt
+from geodesics import Sphere, GeodesicCache
 
-# Surface function, gradient, and Hessian
-def F(x, y, z):
-    return x**2 + y**2 + z**2
+# The sphere of radius 3
+surface = Sphere(3)
 
-def gradF(x, y, z):
-    Fx = 2*x
-    Fy = 2*y
-    Fz = 2*z
-    return stack((Fx, Fy, Fz))
-
-def HF(x, y, z):
-    Fxx = 2
-    Fxy = Fxz = Fyz = 0
-    Fyy = 2
-    Fzz = 2
-    return array([[Fxx, Fxy, Fxz], [Fxy, Fyy, Fyz], [Fxz, Fyz, Fzz]])
-
-# Geodesic solver with given initial position and velocity
-def solve_geodesic(gradF, HF, ip, iv, t_max):
-    def geode(t, y):
-        X = y[:3]
-        Xdot = y[3:]
-        nablaF = gradF(X[0], X[1], X[2])
-        hessian = HF(X[0], X[1], X[2])
-        num = (Xdot[None, :] * hessian * Xdot[:, None]).sum()
-        den = dot(nablaF, nablaF)
-        Xdotdot = - num / den * nablaF
-        return hstack((Xdot, Xdotdot))
-
-    ic = hstack((ip, iv))
-    u = solve_ivp(geode, [0, t_max], ic, dense_output=True, rtol=1e-8, atol=1e-8)
-    return u
+# Solves are memoized in memory and on disk, keyed on the surface, the
+# endpoints and the solver options
+cache = GeodesicCache(".geodesics_cache/geodesics.sqlite")
 
 # Main function to compute initial velocity and geodesic distance
-def compute_geodesic(gradF, HF, ip, fp):
+def compute_geodesic(surface, ip, fp):
     # Ensure final point is on the surface
-    assert abs(F(fp[0], fp[1], fp[2]) - F(ip[0], ip[1], ip[2])) < 1e-6, "Final point is not on the surface!"
-
-    def objective(iv):
-        iv = array(iv) / linalg.norm(iv)  # Ensure unit length
-        result = solve_geodesic(gradF, HF, ip, iv, t_max=50.0)  # Increase t_max if needed
-        final_pos = result.y[:3, -1]  # Extract final position
-        return linalg.norm(final_pos - fp)  # Minimize distance to fp
-
-    # Improved initial guess for velocity
-    init_guess = fp - ip
-    init_guess = init_guess / linalg.norm(init_guess)  # Normalize
-
-    # Use a robust optimizer
-    opt_result = minimize(objective, init_guess, method='Nelder-Mead', options={'maxiter': 1000, 'disp': True})
-    assert opt_result.success, f"Optimization failed! Message: {opt_result.message}"
-
-    # Extract optimized initial velocity
-    iv_opt = opt_result.x / linalg.norm(opt_result.x)  # Normalize to unit vector
+    assert abs(surface.F(*fp) - surface.F(*ip)) < 1e-6, "Final point is not on the surface!"
 
-    # Solve the geodesic with optimized velocity to compute distance
-    geodesic_result = solve_geodesic(gradF, HF, ip, iv_opt, t_max=50.0)
-    path = geodesic_result.y[:3, :]  # Extract the geodesic path
-    distance = sum(sqrt(sum(diff(path, axis=1)**2, axis=0)))  # Compute arc length
+    # Shooting with Newton steps on the initial velocity; the geodesic is
+    # traced on t in [0, 1] so it stops exactly at fp
+    result = cache.shooting(surface, ip, fp)
+    assert result.success, f"Shooting failed! Residual: {result.residual}"
+    print(f"Shooting converged in {result.nit} iterations")
 
-    return iv_opt, distance, path
+    # Extract the geodesic path; its length is the speed of the initial velocity
+    path = result.sol(linspace(0, 1, 200))[:3, :]
+    return result.iv, result.length, path
 
 # Visualization function
 def plot_geodesic(ip, fp, path):
@@ -95,10 +54,10 @@ def plot_geodesic(ip, fp, path):
     plt.show()
 
 # Example usage
-ip = array([0, 0, 3])  # Initial position
-fp = array([0, 3, 0])  # Final position
+ip = array([0, 0, 3], dtype=float)  # Initial position
+fp = array([0, 3, 0], dtype=float)  # Final position
 
-iv_opt, geodesic_distance, path = compute_geodesic(gradF, HF, ip, fp)
+iv_opt, geodesic_distance, path = compute_geodesic(surface, ip, fp)
 
 print(f"Optimal initial velocity direction: {iv_opt}")
 print(f"Geodesic distance: {geodesic_distance:.6f}")
@@ -0,0 +1,48 @@
+import json
+
+import numpy as np
+
+from geodesics import batch
+
+R = 3.0
+SPHERE = {"type": "Sphere", "params": {"R": R}}
+
+
+def test_unknown_kind_is_reported_as_a_failure():
+    result = batch.run_job({"kind": "geodesic", "surface": SPHERE})
+    assert not result["success"]
+    assert result["message"] == "ValueError: unknown job kind 'geodesic'"
+
+
+def test_jobs_round_trip_through_a_file(tmp_path):
+    jobs_file = tmp_path / "jobs.json"
+    jobs_file.write_text(json.dumps({
+        "defaults": {"surface": SPHERE},
+        "jobs": [
+            {"kind": "bvp", "pa": [0, R, 0], "pb": [0, 0, R], "guess": "line"},
+            {"kind": "ivp", "ip": [0, 0, R], "iv": [1, 0, 0], "distance": 2.0},
+            {"name": "quarter", "kind": "shooting", "ip": [0, 0, R], "fp": [0, R, 0]},
+            {"kind": "bvp", "surface": {"type": "Torus"}, "pa": [0, 0], "pb": [1, 1]},
+        ]}))
+    jobs = batch.read_jobs(str(jobs_file))
+    assert [job["name"] for job in jobs] == ["job0", "job1", "quarter", "job3"]
+
+    results = batch.run_jobs(jobs, processes=1)
+    batch.save_npz(tmp_path / "out.npz", jobs, results)
+    out = batch.load_batch(tmp_path / "out.npz")
+    assert out["success"].tolist() == [1, 1, 1, 0]
+    assert np.allclose(out["length"][:3], [R * np.pi / 2, 2.0, R * np.pi / 2], atol=1e-5)
+    assert "unknown surface type" in out["messages"][3]
+    assert out["jobs"] == jobs
+    for path in out["paths"][:3]:
+        assert np.abs(np.linalg.norm(path, axis=0) - R).max() < 1e-5
+    assert out["paths"][3].shape == (3, 0)
+
+
+def test_main_writes_the_results_and_reports_failures(tmp_path, capsys):
+    jobs_file = tmp_path / "jobs.jsonl"
+    jobs_file.write_text(json.dumps({"kind": "ivp", "surface": SPHERE, "ip": [0, 0, R],
+                                     "iv": [1, 0, 0], "distance": 1.0}) + "\n")
+    assert batch.main([str(jobs_file), "-o", str(tmp_path / "out.npz"), "--processes", "1"]) == 0
+    assert (tmp_path / "out.npz").exists()
+    assert "1 jobs" in capsys.readouterr().out
@@ -0,0 +1,34 @@
+import json
+
+from geodesics import benchmark
+
+
+def test_compare_flags_slower_cases():
+    baseline = {"results": {"fast": {"time": 1.0, "nfev": 100}, "slow": {"time": 1.0}}}
+    table = benchmark.compare({"fast": {"time": 1.1, "nfev": 50}, "slow": {"time": 1.5},
+                               "new": {"time": 2.0}}, baseline).splitlines()
+    rows = {line.split()[0] + " " + line.split()[1]: line for line in table[1:]}
+    assert "SLOWER" not in rows["fast time"]
+    assert rows["fast nfev"].split()[-1] == "0.50"
+    assert rows["slow time"].endswith("SLOWER")
+    assert rows["new time"].split()[-1] == "-"
+
+
+def test_history_round_trip_and_lookup(tmp_path):
+    path = str(tmp_path / "history.jsonl")
+    assert benchmark.load_history(path) == []
+    for label in ("base", None, "base"):
+        benchmark.save_run({"label": label, "results": {}}, path)
+    history = benchmark.load_history(path)
+    assert len(history) == 3
+    assert benchmark.find_run(history, "base") is history[2]
+    assert benchmark.find_run(history) is history[2]
+    assert benchmark.find_run(history, "other") is None
+
+
+def test_main_runs_and_records_a_case(tmp_path, capsys):
+    path = str(tmp_path / "history.jsonl")
+    benchmark.main(["sphere_ivp", "--repeat", "1", "--label", "test", "--history", path])
+    run = json.loads(open(path).read())
+    assert run["label"] == "test" and set(run["results"]) == {"sphere_ivp"}
+    assert "sphere_ivp" in capsys.readouterr().out
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from geodesics import (GaussianBump, Sphere, arc_length, chord_guess, endpoint_bc, endpoint_bc_jac,
+                       heat_geodesics, mesh_guess, semicircle_guess, smart_guess,
+                       solve_geodesic_bvp)
+
+R = 3.0
+
+
+def half_circle(**kwargs):
+    return solve_geodesic_bvp(Sphere(R), np.array([0, R, 0]), np.array([0, -R, 0]),
+                              semicircle_guess(R, 100), **kwargs)
+
+
+def test_bvp_half_great_circle():
+    u = half_circle()
+    assert u.success
+    assert np.abs(np.linalg.norm(u.sol(np.linspace(0, 1, 50))[:3], axis=0) - R).max() < 1e-4
+
+
+def test_analytic_jacobian_gives_the_same_geodesic():
+    u, reference = half_circle(jacobian=True), half_circle(jacobian=False)
+    t = np.linspace(0, 1, 50)
+    assert u.success and reference.success
+    assert np.abs(u.sol(t)[:3] - reference.sol(t)[:3]).max() < 1e-4
+
+
+def test_endpoint_bc_jac_matches_endpoint_bc():
+    pa, pb = np.array([1.0, 2, 3]), np.array([-1.0, 0, 2])
+    bc = endpoint_bc(pa, pb)
+    ya, yb = np.arange(6.0), np.arange(6.0, 12)
+    dya, dyb = endpoint_bc_jac(ya, yb)
+    for k in range(6):
+        step = np.eye(6)[k]
+        assert np.allclose(bc(ya + step, yb) - bc(ya, yb), dya[:, k])
+        assert np.allclose(bc(ya, yb + step) - bc(ya, yb), dyb[:, k])
+
+
+def test_chord_guess_lies_on_the_surface_in_one_piece():
+    # Newton projection tears this chord on the steep sides of the bump, so
+    # it is lifted vertically instead.
+    surface = GaussianBump(3)
+    t, y = chord_guess(surface, surface.point(5.0, 5.0), surface.point(-5.0, -5.0))
+    steps = np.linalg.norm(np.diff(y[:3], axis=1), axis=0)
+    assert steps.max() < 1.1 * steps.mean()
+    assert y[2].max() > 2.9
+
+
+def test_smart_guess_warns_when_it_falls_back():
+    with pytest.warns(RuntimeWarning, match="semicircle"):
+        t, y = smart_guess(Sphere(R), np.array([0, 0, R]), np.array([0, 0, -R]))
+    assert np.array_equal(y, semicircle_guess()[1])
+
+
+def test_mesh_guess_goes_round_the_bump():
+    surface = GaussianBump(3)
+    pa, pb = surface.point(5.0, 5.0), surface.point(-5.0, -5.0)
+    Xm, Ym = np.meshgrid(np.linspace(-6, 6, 41), np.linspace(-6, 6, 41))
+    mesh = heat_geodesics(surface, Xm, Ym)
+    around = solve_geodesic_bvp(surface, pa, pb, mesh_guess(mesh, pa, pb))
+    over = solve_geodesic_bvp(surface, pa, pb)
+    assert around.success and over.success
+    assert arc_length(around.sol)[0] == pytest.approx(14.517, abs=1e-3)
+    assert arc_length(over.sol)[0] == pytest.approx(17.558, abs=1e-3)
+    # The edge path needs no factorization.
+    assert mesh._heat is None
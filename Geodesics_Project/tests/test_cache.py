@@ -0,0 +1,43 @@
+import numpy as np
+from scipy.integrate import solve_ivp
+
+from geodesics import GeodesicCache, Sphere, dense_to_ppoly, make_key
+
+R = 3.0
+
+
+def oscillator(t, y):
+    return [y[1], -y[0]]
+
+
+def test_dense_to_ppoly_is_exact_or_declines():
+    t = np.linspace(0, 10, 333)
+    for method in ("RK23", "RK45"):
+        sol = solve_ivp(oscillator, (0, 10), [1, 0], method=method, dense_output=True).sol
+        assert np.abs(dense_to_ppoly(sol)(t) - sol(t)).max() < 1e-12
+    for method in ("DOP853", "Radau"):
+        sol = solve_ivp(oscillator, (0, 10), [1, 0], method=method, dense_output=True).sol
+        assert dense_to_ppoly(sol) is None
+
+
+def test_keys_depend_on_the_surface_and_the_arguments():
+    p = np.array([0.0, 0, R])
+    assert make_key("ivp", Sphere(R), p) == make_key("ivp", Sphere(R), p.copy())
+    assert make_key("ivp", Sphere(R), p) != make_key("ivp", Sphere(2), p)
+    assert make_key("ivp", Sphere(R), p) != make_key("ivp", Sphere(R), -p)
+
+
+def test_geodesic_cache_round_trip(tmp_path):
+    ip, iv = np.array([0, 0, R]), np.array([1.0, 0, 0])
+    t = np.linspace(0, 5, 20)
+    cache = GeodesicCache(tmp_path / "geodesics.sqlite")
+    first = cache.ivp(Sphere(R), ip, iv, 5)
+    # The defaults are part of the key, so spelling one out is still a hit.
+    assert cache.ivp(Sphere(R), ip, iv, 5, rtol=1e-10) is first
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    later = GeodesicCache(tmp_path / "geodesics.sqlite")
+    again = later.ivp(Sphere(R), ip, iv, 5)
+    assert (later.hits, later.misses) == (1, 0)
+    assert np.array_equal(again.sol(t), first.sol(t))
+    assert again.nfev == first.nfev
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from geodesics import (GaussianBump, Sphere, closure_event, geodesic_fan, geodesic_path,
+                       height_event, plane_event, solve_geodesic_ivp, tangent_unit)
+
+R = 3.0
+
+
+def great_circle(ip, iv, t):
+    iv = iv / np.linalg.norm(iv)
+    return np.outer(ip, np.cos(t / R)) + R * np.outer(iv, np.sin(t / R))
+
+
+def test_ivp_follows_the_great_circle():
+    ip = np.array([0, 2, np.sqrt(5)])
+    iv = tangent_unit(Sphere(R), ip, [1, 2, 3])
+    t = np.linspace(0, 7 * np.pi, 200)
+    u = solve_geodesic_ivp(Sphere(R), ip, iv, 7 * np.pi)
+    assert u.success
+    assert np.abs(u.sol(t)[:3] - great_circle(ip, iv, t)).max() < 1e-6
+
+
+def test_tangent_unit_is_a_unit_tangent():
+    ip = np.array([0, 2, np.sqrt(5)])
+    iv = tangent_unit(Sphere(R), ip, [1, 2, 3])
+    assert np.dot(iv, ip) < 1e-14
+    assert abs(np.linalg.norm(iv) - 1) < 1e-14
+
+
+
+@pytest.mark.parametrize("vectorized", [True, False])
+def test_fan_follows_the_great_circles(vectorized):
+    ip = np.array([0, 0, R])
+    ivs = np.column_stack((np.cos(np.arange(5)), np.sin(np.arange(5)), np.zeros(5)))
+    t = np.linspace(0, 10, 50)
+    fan = geodesic_fan(Sphere(R), ip, ivs, 10, n=50, vectorized=vectorized)
+    assert fan.shape == (5, 6, 50)
+    for path, iv in zip(fan, ivs):
+        assert np.abs(path[:3] - great_circle(ip, iv, t)).max() < 1e-6
+
+
+def test_fan_passes_epsilon_to_each_ray():
+    surface = GaussianBump(3)
+    ip = surface.point(0.5, 0.2)
+    ivs = [[1, 0, 0], [0, 1, 0]]
+    kwargs = dict(n=20, epsilon=0.5)
+    one_by_one = geodesic_fan(surface, ip, ivs, 5, vectorized=False, **kwargs)
+    assert np.abs(geodesic_fan(surface, ip, ivs, 5, **kwargs) - one_by_one).max() < 1e-6
+    assert np.abs(geodesic_fan(surface, ip, ivs, 5, n=20) - one_by_one).max() > 1e-3
+
+
+def test_events_stop_at_the_first_crossing():
+    # From the north pole along x: the equator after a quarter circle and
+    # back within 0.1 of the start after a full one.
+    ip = np.array([0, 0, R])
+    u = solve_geodesic_ivp(Sphere(R), ip, [1, 0, 0], 10 * np.pi, events=height_event(0))
+    assert u.status == 1 and abs(u.t[-1] - R * np.pi / 2) < 1e-8
+    u = solve_geodesic_ivp(Sphere(R), ip, [1, 0, 0], 10 * np.pi,
+                           events=plane_event([0, 0, 0], [1, 0, 0], direction=-1))
+    assert abs(u.t[-1] - R * np.pi) < 1e-8
+    u = solve_geodesic_ivp(Sphere(R), ip, [1, 0, 0], 10 * np.pi,
+                           events=closure_event(ip))
+    assert abs(u.t[-1] - (2 * R * np.pi - 0.1)) < 1e-3
+
+
+def test_geodesic_path_samples_only_the_integrated_part():
+    ip = np.array([0, 0, R])
+    y = geodesic_path(Sphere(R), ip, [1, 0, 0], 10 * np.pi, n=50, events=height_event(0))
+    assert y.shape == (6, 50)
+    assert np.abs(y[2, -1]) < 1e-8 and y[2].min() > -1e-8
@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+from geodesics import Ellipsoid, GaussianBump, Sphere, geodesic_path, solve_geodesic_ivp, tangent_unit
+from geodesics.jit import find_kernel, jit_available, jit_geodesic_path
+
+R = 3.0
+
+
+@pytest.mark.skipif(not jit_available(Sphere(R)), reason="numba is not installed")
+@pytest.mark.parametrize("surface", [Sphere(R), GaussianBump(3)])
+def test_jit_matches_scipy(surface):
+    # The same Dormand-Prince pairs and error norm, so the same steps.
+    ip = surface.point(0.5, 0.2) if isinstance(surface, GaussianBump) else np.array([0, 0, R])
+    iv = tangent_unit(surface, ip, [1, 0.3, 0])
+    t = np.linspace(0, 10, 100)
+    u = solve_geodesic_ivp(surface, ip, iv, 10)
+    assert np.abs(jit_geodesic_path(surface, np.hstack((ip, iv)), 10, t) - u.sol(t)).max() < 1e-12
+
+
+@pytest.mark.skipif(not jit_available(Sphere(R)), reason="numba is not installed")
+def test_auto_backend_matches_scipy_backend():
+    ip = np.array([0, 2, np.sqrt(5)])
+    auto = geodesic_path(Sphere(R), ip, [1, 2, 3], 10, n=50)
+    scipy = geodesic_path(Sphere(R), ip, [1, 2, 3], 10, n=50, backend="scipy")
+    assert np.abs(auto - scipy).max() < 1e-12
+
+
+def test_jit_kernels_match_the_exact_class():
+    class Flatter(GaussianBump):
+        pass
+
+    assert find_kernel(Sphere(R))[0] == find_kernel(Ellipsoid())[0]
+    assert find_kernel(Flatter(3)) is None
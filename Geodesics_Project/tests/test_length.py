@@ -0,0 +1,28 @@
+import numpy as np
+
+from geodesics import (Sphere, arc_length, interval_lengths, semicircle_guess, solve_geodesic_bvp,
+                       solve_geodesic_ivp)
+
+R = 3.0
+
+
+def test_ivp_length_is_the_distance_travelled():
+    u = solve_geodesic_ivp(Sphere(R), [0, 2, np.sqrt(5)], [1, 2, 3], 7 * np.pi)
+    length, error = arc_length(u.sol)
+    assert abs(length - 7 * np.pi) < 1e-8
+    assert error < 1e-6
+
+
+def test_bvp_length_beats_a_chord_sum():
+    u = solve_geodesic_bvp(Sphere(R), np.array([0, R, 0]), np.array([0, -R, 0]),
+                           semicircle_guess(R, 100), tol=1e-8)
+    chords = np.linalg.norm(np.diff(u.sol(np.linspace(0, 1, 1000))[:3], axis=1), axis=0).sum()
+    assert abs(arc_length(u.sol)[0] - R * np.pi) < abs(chords - R * np.pi)
+
+
+def test_interval_lengths_add_up_over_a_sub_range():
+    u = solve_geodesic_ivp(Sphere(R), [0, 0, R], [1, 0, 0], 10)
+    lengths, errors = interval_lengths(u.sol, 2.0, 7.5)
+    assert lengths.shape == errors.shape
+    assert abs(lengths.sum() - 5.5) < 1e-8
+    assert abs(arc_length(u.sol, 7.5, 2.0)[0] - 5.5) < 1e-8
@@ -0,0 +1,59 @@
+import numpy as np
+
+from geodesics import (DiskCache, GaussianBump, MeshGeodesics, arc_length, heat_geodesics, semicircle_guess,
+                       solve_geodesic_bvp, surface_mesh)
+from geodesics import mesh as mesh_module
+
+X, Y = np.meshgrid(np.linspace(-5, 5, 81), np.linspace(-5, 5, 81))
+
+
+def test_heat_distance_on_a_plane_is_euclidean():
+    mesh = MeshGeodesics(*surface_mesh(GaussianBump(0), X, Y))
+    source = mesh.nearest_vertex([0, 0, 0])
+    d = mesh.distance(source)
+    exact = np.linalg.norm(mesh.vertices - mesh.vertices[source], axis=1)
+    # Away from the source and the boundary, within a few mesh spacings.
+    inside = (exact > 1) & (exact < 4)
+    assert np.abs(d - exact)[inside].max() < 0.15
+
+
+def test_heat_distance_over_a_bump_matches_the_bvp():
+    surface = GaussianBump(2)
+    mesh = MeshGeodesics(*surface_mesh(surface, X, Y))
+    # Off centre, so the only geodesic passes beside the bump.
+    pa, pb = surface.point(-3.0, 1.5), surface.point(3.0, 1.5)
+    ia, ib = mesh.nearest_vertex([pa, pb])
+    u = solve_geodesic_bvp(surface, pa, pb, semicircle_guess())
+    assert u.success
+    assert abs(mesh.distance(ia)[ib] / arc_length(u.sol)[0] - 1) < 0.03
+
+
+def test_graph_path_runs_between_the_vertices():
+    mesh = MeshGeodesics(*surface_mesh(GaussianBump(2), X, Y))
+    path = mesh.graph_path(0, len(mesh.vertices) - 1)
+    assert np.array_equal(path[0], mesh.vertices[0])
+    assert np.array_equal(path[-1], mesh.vertices[-1])
+
+
+def test_heat_geodesics_reuses_the_operators(tmp_path):
+    surface = GaussianBump(2)
+    first = heat_geodesics(surface, X, Y, cache=tmp_path / "heat.sqlite")
+    assert heat_geodesics(surface, X, Y) is first
+    assert heat_geodesics(GaussianBump(3), X, Y) is not first
+
+    # A new process finds the assembled operators on disk.
+    mesh_module._operators.clear()
+    cache = DiskCache(tmp_path / "heat.sqlite")
+    second = heat_geodesics(surface, X, Y, cache=cache)
+    assert second is not first
+    assert np.allclose(second.distance(0), first.distance(0), rtol=0, atol=1e-12)
+
+
+def test_memory_slots_keep_the_most_recent(monkeypatch):
+    monkeypatch.setattr(mesh_module, "MEMORY_SLOTS", 2)
+    mesh_module._operators.clear()
+    Xs, Ys = X[::8, ::8], Y[::8, ::8]
+    meshes = [heat_geodesics(GaussianBump(a), Xs, Ys) for a in (1, 2, 3)]
+    assert len(mesh_module._operators) == 2
+    assert heat_geodesics(GaussianBump(3), Xs, Ys) is meshes[2]
+    assert heat_geodesics(GaussianBump(1), Xs, Ys) is not meshes[0]
@@ -0,0 +1,45 @@
+import numpy as np
+
+from geodesics import GaussianBump, ManyMountain, Sphere, geodesic_jacobian, geodesic_rhs
+
+
+def random_states(surface, m, seed=0):
+    # m states on the surface with tangent velocities.
+    rng = np.random.default_rng(seed)
+    x, y = rng.uniform(-2, 2, (2, m))
+    X = np.vstack((x, y, surface.height(x, y)))
+    g = surface.gradF(*X)
+    v = rng.normal(size=(3, m))
+    v -= np.sum(g * v, axis=0) / np.sum(g * g, axis=0) * g
+    return np.vstack((X, v))
+
+
+def test_rhs_on_a_mesh_matches_each_column():
+    for surface in (Sphere(3), GaussianBump(3), ManyMountain()):
+        Y = random_states(surface, 50)
+        geode = geodesic_rhs(surface.gradF, surface.HF)
+        batch = geode(0.0, Y)
+        columns = np.column_stack([geode(0.0, Y[:, k]) for k in range(Y.shape[1])])
+        assert np.allclose(batch, columns, rtol=1e-13, atol=1e-13)
+
+
+def test_acceleration_is_normal_to_the_surface():
+    surface = GaussianBump(3)
+    Y = random_states(surface, 20)
+    a = geodesic_rhs(surface.gradF, surface.HF, epsilon=0)(0.0, Y)[3:]
+    g = surface.gradF(*Y[:3])
+    cross = np.cross(a, g, axis=0)
+    assert np.abs(cross).max() < 1e-12 * max(1, np.abs(a).max())
+
+
+def test_jacobian_matches_finite_differences():
+    h = 1e-6
+    for surface in (Sphere(3), GaussianBump(3), ManyMountain()):
+        Y = random_states(surface, 5)
+        geode = geodesic_rhs(surface.gradF, surface.HF)
+        J = geodesic_jacobian(surface.gradF, surface.HF, surface.D3F)(0.0, Y)
+        for k in range(6):
+            step = np.zeros_like(Y)
+            step[k] = h
+            column = (geode(0.0, Y + step) - geode(0.0, Y - step)) / (2 * h)
+            assert np.allclose(J[:, k], column, atol=1e-6)
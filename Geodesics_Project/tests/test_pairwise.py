@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from geodesics import GaussianBump, Sphere, distance_matrix, heat_geodesics
+
+R = 3.0
+
+
+def great_circle_distance(P, Q):
+    cos = np.clip(np.sum(P * Q, axis=-1) / R**2, -1, 1)
+    return R * np.arccos(cos)
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_bvp_distance_matrix_matches_great_circles(processes):
+    rng = np.random.default_rng(0)
+    P = rng.normal(size=(8, 3))
+    P *= R / np.linalg.norm(P, axis=1)[:, None]
+    D = distance_matrix(Sphere(R), P, method="bvp", processes=processes)
+    assert np.array_equal(D, D.T)
+    assert np.abs(D - great_circle_distance(P[:, None], P[None])).max() < 1e-5
+
+
+def test_heat_distance_matrix_on_a_plane(tmp_path):
+    surface = GaussianBump(0)
+    X, Y = np.meshgrid(np.linspace(-5, 5, 61), np.linspace(-5, 5, 61))
+    mesh = heat_geodesics(surface, X, Y)
+    xy = np.random.default_rng(1).uniform(-3, 3, size=(10, 2))
+    D = distance_matrix(surface, xy, mesh=mesh, processes=1, chunk=3)
+    assert np.array_equal(D, D.T) and np.all(np.diag(D) == 0)
+    assert np.abs(D - np.linalg.norm(xy[:, None] - xy[None], axis=2)).max() < 0.3
+
+    on_disk = distance_matrix(surface, xy, mesh=mesh, processes=1, chunk=3,
+                              out=tmp_path / "D.npy")
+    assert np.array_equal(np.load(tmp_path / "D.npy"), D)
+    assert np.array_equal(on_disk, D)
+
+
+def test_heat_needs_a_mesh():
+    with pytest.raises(ValueError, match="needs a mesh"):
+        distance_matrix(Sphere(R), np.eye(3) * R)
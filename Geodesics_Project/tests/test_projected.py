@@ -0,0 +1,21 @@
+import numpy as np
+
+from geodesics import Sphere, solve_geodesic_projected
+from geodesics.projected import constraint_residuals, project_state
+
+R = 3.0
+
+
+def test_projected_stays_on_the_surface():
+    ip = np.array([0, 2, np.sqrt(5)])
+    result = solve_geodesic_projected(Sphere(R), ip, [1, 2, 3], 20 * np.pi)
+    assert result.success
+    assert len(result.residuals["F"]) == np.ceil(20 * np.pi)
+    assert result.t[0] == 0 and result.t[-1] == 20 * np.pi and np.all(np.diff(result.t) > 0)
+    y = result.sol(np.linspace(0, 20 * np.pi, 500))
+    assert np.abs(np.linalg.norm(y[:3], axis=0) - R).max() < 1e-6
+
+
+def test_project_state_restores_the_constraints():
+    y = project_state(Sphere(R), np.array([0.1, 0.2, 3.1, 1.0, 0.5, 0.3]))
+    assert max(constraint_residuals(Sphere(R), y)) < 1e-12
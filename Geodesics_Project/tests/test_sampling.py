@@ -0,0 +1,30 @@
+import numpy as np
+
+from geodesics import Sphere, adaptive_samples, iter_adaptive_samples, solve_geodesic_ivp
+
+R = 3.0
+
+
+def test_adaptive_samples_meet_the_chord_tolerance():
+    u = solve_geodesic_ivp(Sphere(R), [0, 0, R], [1, 0, 0], 2 * np.pi)
+    t, y = adaptive_samples(u.sol, 1e-3)
+    # The sagitta of a chord of angle d on a circle of radius R.
+    d = np.diff(t) / R
+    assert np.max(R * (1 - np.cos(d / 2))) < 1e-3 * 1.01
+    assert t[0] == 0 and abs(t[-1] - 2 * np.pi) < 1e-12
+    assert np.array_equal(y, u.sol(t))
+
+
+def test_chunks_join_up_to_the_whole():
+    u = solve_geodesic_ivp(Sphere(R), [0, 0, R], [1, 0, 0], 20 * np.pi)
+    chunks = list(iter_adaptive_samples(u.sol, 1e-4, batch=16))
+    assert len(chunks) > 1
+    t = np.concatenate([c for c, _ in chunks])
+    assert np.all(np.diff(t) > 0)
+    assert np.array_equal(t, adaptive_samples(u.sol, 1e-4)[0])
+
+
+def test_samples_of_a_sub_range():
+    u = solve_geodesic_ivp(Sphere(R), [0, 0, R], [1, 0, 0], 2 * np.pi)
+    t, _ = adaptive_samples(u.sol, 1e-3, 1.0, 2.5)
+    assert t[0] == 1.0 and t[-1] == 2.5
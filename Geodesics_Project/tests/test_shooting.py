@@ -0,0 +1,34 @@
+import numpy as np
+
+from geodesics import GaussianBump, Sphere, solve_geodesic_bvp, solve_geodesic_shooting
+from geodesics.shooting import tangent_basis
+
+R = 3.0
+
+
+def test_shooting_quarter_and_antipodal():
+    quarter = solve_geodesic_shooting(Sphere(R), [0, 0, R], [0, R, 0])
+    assert quarter.success
+    assert abs(quarter.length - R * np.pi / 2) < 1e-9
+    # The chord is normal to the sphere here, so it has no tangent direction.
+    antipodal = solve_geodesic_shooting(Sphere(R), [0, 0, R], [0, 0, -R], tol=1e-8)
+    assert antipodal.success
+    assert abs(antipodal.length - R * np.pi) < 1e-8
+
+
+def test_shooting_matches_the_bvp():
+    surface = GaussianBump(3)
+    pa, pb = surface.point(2, 1), surface.point(-1, -2)
+    shot = solve_geodesic_shooting(surface, pa, pb)
+    u = solve_geodesic_bvp(surface, pa, pb, tol=1e-8)
+    assert shot.success and u.success
+    assert np.abs(shot.sol(1.0)[:3] - pb).max() < 1e-9
+    assert abs(shot.length - np.trapezoid(np.linalg.norm(u.y[3:], axis=0), u.x)) < 1e-4
+
+
+def test_tangent_basis_is_orthonormal_and_tangent():
+    surface = GaussianBump(3)
+    p = surface.point(0.5, 0.2)
+    basis = tangent_basis(surface, p)
+    assert np.allclose(basis @ basis.T, np.eye(2))
+    assert np.abs(basis @ surface.gradF(*p)).max() < 1e-12
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from geodesics import Ellipsoid, GaussianBump, ManyMountain, Sphere, Surface
+
+SURFACES = [Sphere(3), Ellipsoid(3, 2, 1), GaussianBump(3), ManyMountain()]
+POINTS = np.array([[0.3, -0.2, 0.5], [-0.7, 0.4, -0.1], [0.1, 0.9, 0.2]]).T
+
+
+def central_difference(f, X, h=1e-6):
+    # d f / d X_k stacked on a new last-but-batch axis, for f(x, y, z) -> (..., m).
+    out = []
+    for k in range(3):
+        step = np.zeros_like(X)
+        step[k] = h
+        out.append((np.asarray(f(*(X + step))) - np.asarray(f(*(X - step)))) / (2 * h))
+    return np.stack(out, axis=-2)
+
+
+@pytest.mark.parametrize("surface", SURFACES, ids=repr)
+def test_derivatives_match_finite_differences(surface):
+    m = POINTS.shape[1]
+    grad = central_difference(surface.F, POINTS)
+    assert np.allclose(surface.gradF(*POINTS), grad, atol=1e-7)
+    H = np.broadcast_to(surface.HF(*POINTS), (3, 3, m))
+    assert np.allclose(H, central_difference(surface.gradF, POINTS), atol=1e-6)
+    T = np.broadcast_to(surface.D3F(*POINTS), (3, 3, 3, m))
+    dH = central_difference(lambda *X: np.broadcast_to(surface.HF(*X), (3, 3, m)), POINTS)
+    assert np.allclose(T, dH, atol=1e-5)
+
+
+@pytest.mark.parametrize("surface", SURFACES, ids=repr)
+def test_points_lie_on_the_surface(surface):
+    x, y = np.array([0.3, -0.7, 0.1]), np.array([-0.2, 0.4, 0.9])
+    assert np.abs(surface.F(x, y, surface.height(x, y))).max() < 1e-12
+    assert surface.point(0.3, -0.2) == pytest.approx([0.3, -0.2, surface.height(0.3, -0.2)])
+
+
+def test_base_surface_has_no_height():
+    with pytest.raises(NotImplementedError):
+        Surface().height(0, 0)
@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+from geodesics import (DiskCache, GaussianBump, Sphere, make_key, semicircle_guess,
+                       solve_geodesic_bvp, sweep_grid, sweep_pairs)
+from geodesics.sweep import serpentine_order, warm_guess
+
+SURFACE = GaussianBump(a=2)
+TARGET = SURFACE.point(-5.0, -5.0)
+
+
+def grid(n=4):
+    return np.meshgrid(np.linspace(-5, 5, n), np.linspace(-5, 5, n))
+
+
+def test_sweep_matches_single_solves():
+    X, Y = grid(3)
+    result = sweep_grid(SURFACE, X, Y, TARGET, processes=1)
+    for i in range(X.size):
+        u = solve_geodesic_bvp(SURFACE, SURFACE.point(X.flat[i], Y.flat[i]), TARGET,
+                               semicircle_guess())
+        assert result["success"].flat[i] == u.success
+        if u.success:
+            assert result["max_z"].flat[i] == u.sol(np.linspace(0, 1, 100))[2].max()
+
+
+def test_pool_and_cache_give_the_same_map(tmp_path):
+    X, Y = grid()
+    serial = sweep_grid(SURFACE, X, Y, TARGET, processes=1)
+    cache = tmp_path / "sweep.sqlite"
+    pooled = sweep_grid(SURFACE, X, Y, TARGET, processes=2, cache=cache)
+    assert len(DiskCache(cache)) == X.size
+    cached = sweep_grid(SURFACE, X, Y, TARGET, processes=2, cache=cache)
+    for name in serial:
+        assert np.allclose(serial[name], pooled[name], equal_nan=True)
+        assert np.array_equal(pooled[name], cached[name], equal_nan=True)
+
+
+def test_disk_cache_round_trip(tmp_path):
+    cache = DiskCache(tmp_path / "cache.sqlite")
+    key = make_key("test", SURFACE, np.arange(3.0), 1e-5)
+    assert key == make_key("test", GaussianBump(a=2), [0.0, 1.0, 2.0], 1e-5)
+    assert key != make_key("test", GaussianBump(a=3), [0.0, 1.0, 2.0], 1e-5)
+    cache.set(key, {"x": np.arange(4.0), "n": 3.0})
+    assert key in cache and cache.get("missing") is None
+    assert np.array_equal(cache.get(key)["x"], np.arange(4.0))
+
+
+def test_serpentine_order_steps_between_neighbours():
+    order = serpentine_order((4, 5))
+    rows, cols = np.unravel_index(order, (4, 5))
+    assert sorted(order) == list(range(20))
+    assert np.all(np.abs(np.diff(rows)) + np.abs(np.diff(cols)) == 1)
+
+
+def test_sweep_pairs_order():
+    starts = np.array([SURFACE.point(5.0, 5.0), SURFACE.point(5.0, -5.0)])
+    result = sweep_pairs(SURFACE, starts, TARGET, processes=1)
+    assert result["success"].tolist() == [1.0, 1.0]
+    assert result["length"][0] > result["length"][1]
+
+
+def test_warm_guess_moves_the_ends():
+    u = solve_geodesic_bvp(SURFACE, SURFACE.point(5.0, 5.0), TARGET, semicircle_guess())
+    pa, pb = SURFACE.point(4.5, 5.0), SURFACE.point(-5.0, -4.5)
+    t, y = warm_guess(u.sol, u.x, pa, pb)
+    assert np.allclose(y[:3, 0], pa) and np.allclose(y[:3, -1], pb)
+
+
+def test_continuation_matches_cold_solves_away_from_ambiguity():
+    # Starts on one side of the bump only, where there is one geodesic.
+    X, Y = np.meshgrid(np.linspace(0, 5, 4), np.linspace(-5, -2, 3))
+    cold = sweep_grid(SURFACE, X, Y, TARGET, guess="smart", processes=1)
+    warm = sweep_grid(SURFACE, X, Y, TARGET, guess="smart", processes=1, continuation=True)
+    assert np.allclose(warm["length"], cold["length"], atol=1e-4)
+
+
+@pytest.mark.filterwarnings("ignore:chord cannot be projected:RuntimeWarning")
+def test_continuation_does_not_go_the_long_way_round():
+    # Starts along a great circle through the target's antipode: past it,
+    # the chain's previous geodesic leads the long way round.
+    R = 3.0
+    a = np.linspace(0.2, 2 * np.pi - 0.2, 40)
+    starts = np.column_stack((R * np.sin(a), 0 * a, R * np.cos(a)))
+    result = sweep_pairs(Sphere(R), starts, np.array([0, 0, R]), continuation=True,
+                         guess="smart", processes=1)
+    assert np.abs(result["length"] - R * np.minimum(a, 2 * np.pi - a)).max() < 1e-5
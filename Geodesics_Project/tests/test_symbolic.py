@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from geodesics import GaussianBump, Sphere, SymbolicSurface
+from geodesics import symbolic
+
+
+def test_symbolic_sphere_matches_the_hand_written_one(tmp_path):
+    surface = SymbolicSurface("(x**2 + y**2 + z**2) / r**2 - 1", {"r": 3}, cache_dir=tmp_path)
+    p = np.array([[0.5, -1.0], [0.2, 2.0], [2.9, 1.5]])
+    assert np.allclose(surface.gradF(*p), Sphere(3).gradF(*p))
+    assert np.allclose(surface.HF(*p), Sphere(3).HF(*p))
+    assert np.allclose(surface.D3F(*p), Sphere(3).D3F(*p))
+
+
+def test_symbolic_height_only_for_graphs(tmp_path):
+    sphere = SymbolicSurface("x**2 + y**2 + z**2 - 9", cache_dir=tmp_path)
+    with pytest.raises(NotImplementedError):
+        sphere.height(0, 0)
+    bump = SymbolicSurface.from_height("a*exp(-x**2 - y**2)", {"a": 3}, cache_dir=tmp_path)
+    assert bump.height(0.5, 0.2) == pytest.approx(GaussianBump(3).height(0.5, 0.2))
+    assert np.allclose(bump.gradF(0.5, 0.2, 1.0), GaussianBump(3).gradF(0.5, 0.2, 1.0))
+
+
+def test_source_cache_is_keyed_by_the_generator_version(tmp_path, monkeypatch):
+    symbolic.compile_surface_source("x**2 + y**2 - z", cache_dir=tmp_path)
+    symbolic.compile_surface_source("x**2 + y**2 - z", cache_dir=tmp_path)
+    assert len(list(tmp_path.iterdir())) == 1
+    monkeypatch.setattr(symbolic, "_GENERATOR_VERSION", symbolic._GENERATOR_VERSION + 1)
+    symbolic.compile_surface_source("x**2 + y**2 - z", cache_dir=tmp_path)
+    assert len(list(tmp_path.iterdir())) == 2
+
+
+def test_unbound_symbols_are_rejected(tmp_path):
+    with pytest.raises(ValueError, match="unbound"):
+        SymbolicSurface("x**2 + y**2 + z**2 - r**2", cache_dir=tmp_path)
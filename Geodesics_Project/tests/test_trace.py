@@ -0,0 +1,35 @@
+import json
+
+import numpy as np
+
+from geodesics import Sphere, Trace, semicircle_guess, solve_geodesic_bvp, solve_geodesic_ivp
+
+R = 3.0
+
+
+def test_trace_records_the_bvp_without_changing_it():
+    pa, pb = np.array([0, R, 0]), np.array([0, -R, 0])
+    trace = Trace(case="half circle")
+    u = solve_geodesic_bvp(Sphere(R), pa, pb, semicircle_guess(R, 100), trace=trace)
+    plain = solve_geodesic_bvp(Sphere(R), pa, pb, semicircle_guess(R, 100))
+    assert np.array_equal(u.y, plain.y)
+
+    summary = trace.summary()
+    assert {"gradF", "HF", "geode", "jac", "bc"} <= set(summary)
+    assert summary["geode"]["calls"] == trace.names.count("geode")
+    assert trace.meta["case"] == "half circle" and trace.meta["nodes"] == u.x.size
+    # Refinement starts from the guess's mesh and the sizes never shrink.
+    nodes = [size for size, _ in trace.mesh_history()]
+    assert nodes[0] == 100 and nodes == sorted(nodes)
+
+
+def test_trace_counts_ivp_rhs_calls(tmp_path):
+    trace = Trace()
+    u = solve_geodesic_ivp(Sphere(R), [0, 0, R], [1, 0, 0], 5, trace=trace)
+    assert trace.summary()["geode"]["calls"] == u.nfev
+    assert trace.mesh_history() == []
+
+    trace.to_json(tmp_path / "trace.json")
+    trace.to_csv(tmp_path / "trace.csv")
+    assert json.loads((tmp_path / "trace.json").read_text())["summary"]["geode"]["calls"] == u.nfev
+    assert len((tmp_path / "trace.csv").read_text().splitlines()) == len(trace) + 1
@@ -1,6 +1,11 @@
 # n-sided Pursuit Curve Simulation
+import io
+import os
+import struct
+
 import numpy as np
 import matplotlib.pyplot as plt
+from scipy.integrate import solve_ivp
 
 def create_polygon(n_sides, radius=10):
     """Create regular polygon with n sides centered at the origin."""
@@ -9,34 +14,233 @@ def create_polygon(n_sides, radius=10):
     y = radius * np.sin(angles)
     return np.column_stack((x, y))
 
+def _sides(vertices):
+    """Vectors from each vertex to the next one and their lengths."""
+    direction = np.roll(vertices, -1, axis=0) - vertices
+    return direction, np.sqrt(np.einsum('ij,ij->i', direction, direction))
+
+def _euler_frames(vertices, velocity, dt, steps, threshold):
+    """Yield the polygon after each Euler step, starting with the initial one."""
+    vertices = np.array(vertices, dtype=float)
+    yield vertices
+    step = velocity * dt
+
+    for k in range(1, steps + 1):
+        # Each vertex chases the next one; the same sides give the stopping test
+        direction, norm = _sides(vertices)
+        norm = norm[:, None]
+
+        # Stop if all points are very close to each other (converged)
+        if k > 1 and norm.max() < threshold:
+            return
+
+        vertices = vertices + np.divide(direction, norm, out=np.zeros_like(direction),
+                                        where=norm > 0) * step
+        yield vertices
+
 def pursuit_simulation(vertices, velocity=0.5, dt=0.1, steps=1000, threshold=0.01):
     """Simulate pursuit motion of polygon vertices towards the next vertex."""
+    vertices = np.asarray(vertices)
+    trajectory = np.empty((steps + 1,) + vertices.shape)
+    for k, frame in enumerate(_euler_frames(vertices, velocity, dt, steps, threshold)):
+        trajectory[k] = frame
+    # A view of an early stop would keep the whole buffer alive
+    return trajectory if k == steps else trajectory[:k + 1].copy()
+
+def iter_pursuit(vertices, velocity=0.5, dt=0.1, steps=1000, threshold=0.01, every=1, chunk=None):
+    """Yield pursuit_simulation's frames as they are computed, keeping every `every`-th.
+
+    The last frame is always kept. With chunk, frames come in arrays of up
+    to chunk frames instead of one at a time. Memory stays constant however
+    long the run.
+    """
+    frames = _decimate(_euler_frames(vertices, velocity, dt, steps, threshold), every)
+    if chunk is None:
+        yield from frames
+        return
+    buffer = np.empty((chunk,) + np.shape(vertices))
+    filled = 0
+    for frame in frames:
+        buffer[filled] = frame
+        filled += 1
+        if filled == chunk:
+            yield buffer.copy()
+            filled = 0
+    if filled:
+        yield buffer[:filled].copy()
+
+def _decimate(frames, every):
+    """Every `every`-th frame, plus the last one."""
+    last = None
+    for k, frame in enumerate(frames):
+        if k % every:
+            last = frame
+        else:
+            last = None
+            yield frame
+    if last is not None:
+        yield last
+
+def save_trajectory(path, vertices, velocity=0.5, dt=0.1, steps=1000, threshold=0.01, every=1,
+                    chunk=1024):
+    """Stream iter_pursuit's frames into a .npy file and return it memory-mapped.
+
+    Frames go straight to disk a chunk at a time, so runs far larger than
+    memory work; load the result later with np.load(path, mmap_mode='r').
+    chunk must be a number of frames here, not None.
+    """
+    if chunk is None or chunk < 1:
+        raise ValueError("save_trajectory needs a chunk size of at least one frame")
+    shape = np.shape(vertices)
+    capacity = steps // every + 2
+    out = np.lib.format.open_memmap(path, mode='w+', dtype=float, shape=(capacity,) + shape)
+    count = 0
+    for frames in iter_pursuit(vertices, velocity, dt, steps, threshold, every, chunk):
+        out[count:count + len(frames)] = frames
+        count += len(frames)
+    out.flush()
+    offset = out.offset
+    del out
+    _truncate_npy(path, offset, (count,) + shape)
+    return np.load(path, mmap_mode='r')
+
+def _truncate_npy(path, offset, shape):
+    """Shrink a float .npy file written by open_memmap to its first shape[0] rows."""
+    header = io.BytesIO()
+    np.lib.format.write_array_header_1_0(
+        header, {'descr': np.lib.format.dtype_to_descr(np.dtype(float)),
+                 'fortran_order': False, 'shape': shape})
+    header = header.getvalue()
+    # A smaller shape never needs a longer header; pad it to the data offset.
+    text = header[10:-1] + b' ' * (offset - len(header)) + b'\n'
+    with open(path, 'r+b') as f:
+        f.write(header[:8] + struct.pack('<H', len(text)) + text)
+        f.truncate(offset + int(np.prod(shape)) * np.dtype(float).itemsize)
+
+def _converged_start(vertices, threshold):
+    """Whether the adaptive solvers have nothing to integrate.
+
+    Their stopping event only fires when the longest side falls through
+    threshold; without it they would integrate into the collapse, where
+    the steps shrink without end.
+    """
+    if threshold <= 0:
+        raise ValueError("threshold must be positive")
+    return _sides(vertices)[1].max() < threshold
+
+def pursuit_ivp(vertices, velocity=0.5, threshold=0.01, method="DOP853", rtol=1e-10, atol=1e-12):
+    """Integrate the pursuit motion adaptively until every side is below threshold.
+
+    Returns the polygon at each accepted solver step and the trace length,
+    the distance each mouse runs (velocity times the time taken). A polygon
+    that starts below threshold is returned as is, with length 0.
+    """
+    vertices = np.array(vertices, dtype=float)
+    shape = vertices.shape
+    if _converged_start(vertices, threshold):
+        return vertices[None], 0.0
+
+    def rhs(t, y):
+        direction, norm = _sides(y.reshape(shape))
+        norm = norm[:, None]
+        return (np.divide(direction, norm, out=np.zeros_like(direction), where=norm > 0)
+                * velocity).ravel()
+
+    def converged(t, y):
+        return _sides(y.reshape(shape))[1].max() - threshold
+    converged.terminal = True
+    converged.direction = -1
+
+    # Every side shrinks at least at rate velocity * (1 - cos(exterior angle)) > 0
+    # for a convex polygon, so this bounds the time to converge.
+    perimeter = _sides(vertices)[1].sum()
+    t_max = perimeter / velocity * len(vertices) ** 2
+    sol = solve_ivp(rhs, (0, t_max), vertices.ravel(), method=method, events=converged,
+                    rtol=rtol, atol=atol)
+    t_end = sol.t_events[0][0] if sol.t_events[0].size else sol.t[-1]
+    return sol.y.T.reshape((-1,) + shape), velocity * t_end
+
+def regular_rotation(vertices, tol=1e-9):
+    """Center and turning angle (+-2pi/n) if the vertices form a regular polygon, else None."""
+    vertices = np.asarray(vertices, dtype=float)
     n = len(vertices)
-    trajectory = [vertices.copy()]
+    if n < 2:
+        return None
+    center = vertices.mean(axis=0)
+    z = (vertices[:, 0] - center[0]) + 1j * (vertices[:, 1] - center[1])
+    scale = np.abs(z).max()
+    if scale == 0:
+        return None
+    for angle in (2 * np.pi / n, -2 * np.pi / n):
+        if np.abs(np.roll(z, -1) - z * np.exp(1j * angle)).max() <= tol * scale:
+            return center, angle
+    return None
 
-    for _ in range(steps):
-        new_vertices = vertices.copy()
-        for i in range(n):
-            target = vertices[(i + 1) % n]
-            direction = target - vertices[i]
-            norm = np.linalg.norm(direction)
-            if norm > 0:
-                direction /= norm
-                new_vertices[i] += direction * velocity * dt
+def closed_form_length(vertices, threshold=0.0):
+    """Exact trace length for a regular polygon, stopping when the sides reach threshold.
 
-        vertices = new_vertices
-        trajectory.append(vertices.copy())
+    The sides shrink at rate velocity * (1 - cos(2pi/n)), so each mouse
+    runs (side - threshold) / (1 - cos(2pi/n)). threshold=0 gives the whole
+    path to the meeting point, which the solvers cannot reach (they need a
+    positive threshold).
+    """
+    vertices = np.asarray(vertices, dtype=float)
+    side = np.linalg.norm(vertices[1] - vertices[0])
+    return (side - threshold) / (1 - np.cos(2 * np.pi / len(vertices)))
 
-        # Stop if all points are very close to each other (converged)
-        if all(np.linalg.norm(vertices[(i + 1) % n] - vertices[i]) < threshold for i in range(n)):
-            break
+def pursuit_reduced(vertices, velocity=0.5, threshold=0.01, method="DOP853", rtol=1e-10, atol=1e-12):
+    """Like pursuit_ivp, but a regular polygon is solved as a single mouse.
+
+    The mice of a regular polygon stay on a rotating, shrinking regular
+    polygon, so one mouse chasing its own rotated copy gives all of them.
+    Irregular starts fall back to the full integration in pursuit_ivp, and
+    starts already below threshold return at once, as there.
+    """
+    vertices = np.array(vertices, dtype=float)
+    if _converged_start(vertices, threshold):
+        return vertices[None], 0.0
+    regular = regular_rotation(vertices)
+    if regular is None:
+        return pursuit_ivp(vertices, velocity, threshold, method, rtol, atol)
+    center, angle = regular
+    n = len(vertices)
+    rotate = np.array([[np.cos(angle), -np.sin(angle)], [np.sin(angle), np.cos(angle)]])
+    gap = np.linalg.norm(rotate - np.eye(2), 2)  # side length per unit radius
+
+    def rhs(t, p):
+        direction = rotate @ p - p
+        norm = np.linalg.norm(direction)
+        return direction / norm * velocity if norm > 0 else np.zeros(2)
+
+    def converged(t, p):
+        return gap * np.linalg.norm(p) - threshold
+    converged.terminal = True
+    converged.direction = -1
+
+    p0 = vertices[0] - center
+    t_max = 2 * np.linalg.norm(p0) / velocity / (1 - np.cos(angle))
+    sol = solve_ivp(rhs, (0, t_max), p0, method=method, events=converged, rtol=rtol, atol=atol)
+    t_end = sol.t_events[0][0] if sol.t_events[0].size else sol.t[-1]
+
+    # Mouse j is mouse 0 turned j times about the center.
+    turns = np.stack([np.linalg.matrix_power(rotate, j) for j in range(n)])
+    trajectory = center + np.einsum('jab,bk->kja', turns, sol.y)
+    return trajectory, velocity * t_end
+
+def trace_length(trajectory):
+    """Distance the first mouse travels along a trajectory."""
+    return np.linalg.norm(np.diff(trajectory[:, 0], axis=0), axis=1).sum()
 
-    return np.array(trajectory)
+def plot_trajectory(trajectory, title="Pursuit Polygon Simulation", every=1):
+    """Plot the trajectory of the polygon shrinking, every `every`-th frame.
 
-def plot_trajectory(trajectory, title="Pursuit Polygon Simulation"):
-    """Plot the trajectory of the polygon shrinking."""
+    trajectory is an array or the path of a .npy file (e.g. from
+    save_trajectory), which is read frame by frame from disk.
+    """
+    if isinstance(trajectory, (str, os.PathLike)):
+        trajectory = np.load(trajectory, mmap_mode='r')
     plt.figure(figsize=(8, 8))
-    for frame in trajectory:
+    for frame in trajectory[::every]:
         closed = np.vstack([frame, frame[0]])  # Close the polygon
         plt.plot(closed[:, 0], closed[:, 1], 'k-', alpha=0.1)
     plt.title(title)
@@ -57,4 +261,12 @@ if __name__ == "__main__":
 
     initial_vertices = create_polygon(n_sides)
     traj = pursuit_simulation(initial_vertices, velocity=0.5, dt=dt, steps=1000)
+    adaptive, length = pursuit_ivp(initial_vertices, velocity=0.5)
+    print(f"Trace length, Euler with dt={dt}: {trace_length(traj):.6f} ({len(traj) - 1} steps)")
+    print(f"Trace length, adaptive DOP853: {length:.10f} ({len(adaptive) - 1} steps)")
+    reduced, length = pursuit_reduced(initial_vertices, velocity=0.5)
+    exact = closed_form_length(initial_vertices, threshold=0.01)
+    print(f"Trace length, one-mouse reduction: {length:.10f} ({len(reduced) - 1} steps)")
+    print(f"Closed form (side - threshold) / (1 - cos(2pi/n)): {exact:.10f}, "
+          f"error {abs(length - exact):.2e}")
     plot_trajectory(traj)
@@ -0,0 +1,113 @@
+# Invariants of the pursuit simulations. Run with `python -m pytest` from this folder.
+import matplotlib
+matplotlib.use("Agg")
+
+import numpy as np
+import pytest
+
+from basicmodel import (closed_form_length, create_polygon, iter_pursuit, plot_trajectory,
+                        pursuit_ivp, pursuit_reduced, pursuit_simulation, regular_rotation,
+                        save_trajectory, trace_length)
+
+
+def reference_simulation(vertices, velocity=0.5, dt=0.1, steps=1000, threshold=0.01):
+    # The original one-vertex-at-a-time loop.
+    vertices = np.array(vertices, dtype=float)
+    trajectory = [vertices.copy()]
+    n = len(vertices)
+    for _ in range(steps):
+        new = vertices.copy()
+        for i in range(n):
+            direction = vertices[(i + 1) % n] - vertices[i]
+            norm = np.linalg.norm(direction)
+            if norm > 0:
+                new[i] += direction / norm * velocity * dt
+        distances = [np.linalg.norm(vertices[(i + 1) % n] - vertices[i]) for i in range(n)]
+        if max(distances) < threshold:
+            break
+        vertices = new
+        trajectory.append(vertices.copy())
+    return np.array(trajectory)
+
+
+@pytest.mark.parametrize("n, dt, steps", [(3, 0.05, 800), (6, 0.01, 5000), (40, 0.1, 300)])
+def test_simulation_matches_the_loop(n, dt, steps):
+    vertices = create_polygon(n, radius=1)
+    expected = reference_simulation(vertices, dt=dt, steps=steps)
+    trajectory = pursuit_simulation(vertices, dt=dt, steps=steps)
+    assert trajectory.shape == expected.shape
+    assert np.abs(trajectory - expected).max() < 1e-12
+
+
+def test_early_stop_does_not_keep_the_buffer():
+    trajectory = pursuit_simulation(create_polygon(4, radius=1), dt=0.01, steps=100000)
+    assert len(trajectory) < 100001
+    assert trajectory.base is None
+
+
+@pytest.mark.parametrize("every, chunk", [(1, None), (3, None), (7, 64), (1, 1)])
+def test_streaming_matches_the_simulation(tmp_path, every, chunk):
+    vertices = create_polygon(6, radius=1)
+    full = pursuit_simulation(vertices, dt=0.01, steps=5000)
+    expected = full[::every]
+    if (len(full) - 1) % every:
+        expected = np.concatenate((expected, full[-1:]))
+    frames = list(iter_pursuit(vertices, dt=0.01, steps=5000, every=every, chunk=chunk))
+    assert np.array_equal(np.stack(frames) if chunk is None else np.concatenate(frames), expected)
+    saved = save_trajectory(tmp_path / "run.npy", vertices, dt=0.01, steps=5000, every=every,
+                            chunk=chunk or 50)
+    assert np.array_equal(np.load(tmp_path / "run.npy"), expected)
+    assert np.array_equal(saved, expected)
+
+
+def test_save_trajectory_needs_a_chunk(tmp_path):
+    with pytest.raises(ValueError):
+        save_trajectory(tmp_path / "run.npy", create_polygon(7), steps=100, chunk=None)
+
+
+def test_plot_trajectory_reads_from_disk(tmp_path):
+    save_trajectory(tmp_path / "run.npy", create_polygon(5), steps=200)
+    plot_trajectory(tmp_path / "run.npy", every=10)
+
+
+@pytest.mark.parametrize("n", [2, 3, 6, 12])
+def test_adaptive_lengths_match_the_closed_form(n):
+    vertices = create_polygon(n)
+    exact = closed_form_length(vertices, threshold=0.01)
+    assert pursuit_ivp(vertices)[1] == pytest.approx(exact, abs=1e-7)
+    assert pursuit_reduced(vertices)[1] == pytest.approx(exact, abs=1e-7)
+
+
+def test_euler_converges_to_the_closed_form():
+    vertices = create_polygon(6)
+    exact = closed_form_length(vertices, threshold=0.01)
+    error = abs(trace_length(pursuit_simulation(vertices, dt=0.001, steps=100000)) - exact)
+    assert error < 1e-2
+
+
+def test_reduced_solution_matches_the_full_one():
+    vertices = create_polygon(8) + [3, 4]
+    reduced, length = pursuit_reduced(vertices)
+    full, full_length = pursuit_ivp(vertices)
+    assert length == pytest.approx(full_length, abs=1e-8)
+    assert np.abs(reduced[-1] - full[-1]).max() < 1e-6
+
+
+def test_regular_rotation():
+    assert regular_rotation(create_polygon(5)) is not None
+    assert regular_rotation(create_polygon(5)[::-1])[1] == pytest.approx(-2 * np.pi / 5)
+    assert regular_rotation(np.random.default_rng(1).normal(size=(7, 2))) is None
+
+
+def test_irregular_start_falls_back_to_the_full_system():
+    vertices = create_polygon(5) + np.random.default_rng(2).normal(size=(5, 2)) * 0.5
+    assert regular_rotation(vertices) is None
+    assert pursuit_reduced(vertices)[1] == pursuit_ivp(vertices)[1]
+
+
+@pytest.mark.parametrize("solver", [pursuit_ivp, pursuit_reduced])
+def test_adaptive_solvers_return_at_once(solver):
+    trajectory, length = solver(create_polygon(4, radius=0.001))
+    assert length == 0 and len(trajectory) == 1
+    with pytest.raises(ValueError):
+        solver(create_polygon(6), threshold=0)